@@ -1,16 +1,316 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
-import re
+import math
+import random
+from decimal import Decimal
+from dataclasses import dataclass, field
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import atexit
+import tempfile
+import logging
+import logging.handlers
 import numpy as np
+from binance import ThreadedWebsocketManager
 from binance.client import Client
+from binance.exceptions import BinanceAPIException, BinanceRequestException
 from dotenv import load_dotenv
 
+try:
+    from numba import njit  # optional - JIT-compiles the per-trade price maths
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so the helpers run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson  # much faster JSON for exchange_info / position payloads and DeepSeek bodies
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        """bytes like orjson.dumps"""
+        return json.dumps(obj).encode()
+
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger("bot")
+
+
+def setup_logging():
+    """Queued logging - the trading thread only enqueues records; a background
+    listener thread formats them and does the blocking stdout/file writes"""
+    if log.handlers:
+        return  # already configured
+    log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    file_handler = logging.handlers.RotatingFileHandler(
+        'bot.log', maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    log_queue = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    atexit.register(listener.stop)  # drain whatever is still queued on exit
+
+
+def precision_from_step(step_size):
+    """Decimal places implied by a Binance stepSize/tickSize string (0.001 -> 3, 0.5 -> 1, 1 -> 0)"""
+    # Exact decimal digits - log10 mis-reads steps that aren't powers of ten (0.5, 0.025)
+    step = Decimal(str(step_size)).normalize()
+    if step <= 0:
+        return 0
+    return max(0, -step.as_tuple().exponent)
+
+
+class FastJSONClient(Client):
+    """Binance Client that decodes REST responses with orjson (stdlib json if not installed)"""
+    
+    @staticmethod
+    def _handle_response(response):
+        if not (200 <= response.status_code < 300):
+            raise BinanceAPIException(response, response.status_code, response.text)
+        
+        if not response.content:
+            return {}
+        
+        try:
+            return json_loads(response.content)  # bytes straight in, no str decode first
+        except ValueError:
+            raise BinanceRequestException("Invalid Response: %s" % response.text)
+
+
+def pool_binance_session(client):
+    """Mount a larger keep-alive connection pool on a Binance client's requests session"""
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=50, max_retries=0)
+    client.session.mount('https://', adapter)
+    client.session.mount('http://', adapter)
+    client.session.headers.update({'Connection': 'keep-alive'})
+    return client
+
+
+def is_transient_error(e):
+    """Network trouble, 5xx, rate limits (418/429/-1003) or clock skew (-1021) - says nothing about the request itself"""
+    if isinstance(e, requests.exceptions.RequestException):
+        return True
+    if isinstance(e, BinanceAPIException):
+        return e.status_code >= 500 or e.status_code in (418, 429) or e.code in (-1003, -1021)
+    return False
+
+
+def warm_binance_client(client):
+    """Open the fapi connection and sync the signing clock once, before the first real order"""
+    client.futures_ping()
+    server_time = client.futures_time()['serverTime']
+    client.timestamp_offset = server_time - int(time.time() * 1000)
+    return client
+
+
+@njit(cache=True)
+def round_to_tick(price, tick):
+    """Nearest multiple of tick"""
+    return round(price / tick) * tick
+
+
+@njit(cache=True)
+def compute_tp_sl(entry_price, sign, tp_pct, sl_pct, tick):
+    """TP/SL for a position (sign +1 LONG / -1 SHORT), snapped outward to the tick grid so both sit on the right side of entry"""
+    take_profit = entry_price * (1 + sign * tp_pct)
+    stop_loss = entry_price * (1 - sign * sl_pct)
+    if tick > 0:
+        # LONG: TP rounds up, SL rounds down - SHORT is the mirror image
+        tp_steps = round(take_profit / tick, 9)
+        sl_steps = round(stop_loss / tick, 9)
+        take_profit = (math.ceil(tp_steps) if sign > 0 else math.floor(tp_steps)) * tick
+        stop_loss = (math.floor(sl_steps) if sign > 0 else math.ceil(sl_steps)) * tick
+    return take_profit, stop_loss
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_json_object(content):
+    """First complete JSON object in an LLM reply, ignoring any prose around it (None if there is none)"""
+    start = content.find('{')
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(content, start)
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+        start = content.find('{', start + 1)
+    return None
+
+
+def read_streamed_json_object(response):
+    """First complete JSON object from a streamed (SSE) chat completion - stops reading as soon as it closes"""
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    for line in response.iter_lines():
+        if not line.startswith(b"data: "):
+            continue
+        data = line[6:]
+        if data == b"[DONE]":
+            break
+        text = json_loads(data)['choices'][0]['delta'].get('content') or ''
+        parts.append(text)
+        
+        # Brace depth outside JSON strings - depth back at 0 means an object just closed
+        for ch in text:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"' and depth:
+                in_string = True
+            elif ch == '{':
+                depth += 1
+            elif ch == '}' and depth:
+                depth -= 1
+                if not depth:
+                    obj = extract_json_object(''.join(parts))
+                    if obj is not None:
+                        return obj  # the rest of the completion is prose - don't wait for it
+    return extract_json_object(''.join(parts))
+
+
+KLINE_INTERVAL_MS = 15 * 60 * 1000  # 15m candles
+KLINE_WINDOW = 20                   # candles kept per pair
+
+
+DEEPSEEK_URL = "https://api.deepseek.com/v1/chat/completions"
+
+
+# Scalping prompt skeleton - one request carries every candidate pair, only the market lines change per call
+_SCALP_PROMPT_TMPL = """
+        URGENT SCALPING ANALYSIS FOR {count} ALTCOIN PAIRS:
+
+        CURRENT MARKET DATA (one line per pair):
+{pair_lines}
+
+        SCALPING STRATEGY - BOTH LONG & SHORT:
+        LONG opportunities:
+        - Price near support levels (1H range low)
+        - Oversold conditions (recent dip)
+        - Positive momentum reversal
+        - High volume buying
+
+        SHORT opportunities:
+        - Price near resistance levels (1H range high)
+        - Overbought conditions (recent pump)
+        - Negative momentum reversal
+        - High volume selling
+
+        Analyze EACH pair for IMMEDIATE scalping entry within next 1-5 candles.
+        Recommend SHORT if bearish signals are stronger than bullish.
+
+        RESPONSE (JSON only) - exactly one decision per pair:
+        {{
+            "decisions": [
+                {{
+                    "action": "TRADE/SKIP",
+                    "pair": "SYMBOL",
+                    "direction": "LONG/SHORT",
+                    "entry_price": number,
+                    "stop_loss": number,
+                    "take_profit": number,
+                    "position_size_usd": {trade_size_usd},
+                    "confidence": 0-100,
+                    "timeframe": "5-30min",
+                    "reason": "Specific LONG/SHORT technical reason...",
+                    "urgency": "high/medium/low"
+                }}
+            ]
+        }}
+        """
+
+_SCALP_PAIR_LINE_TMPL = (
+    "        - {pair}: Price ${price:.{decimals}f} | 1H {change_1h:.2f}% | 4H {change_4h:.2f}% | "
+    "Volume {volume_ratio:.2f}x | Volatility {volatility:.2f}% | 1H Range ${low_1h:.{decimals}f} - ${high_1h:.{decimals}f}"
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket - blocks only as long as needed to stay under an order rate limit"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate        # tokens refilled per second
+        self.burst = burst      # bucket capacity
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass(slots=True)
+class ActiveTrade:
+    """Open scalping position tracked until its TP/SL fills"""
+    pair: str
+    direction: str
+    entry_price: float
+    quantity: float
+    stop_loss: float
+    take_profit: float
+    entry_time: float   # wall clock - order tags and display
+    confidence: float
+    entry_mono: float = field(default_factory=time.monotonic)  # durations survive NTP clock steps
+    exit_order_ids: tuple = ()  # clientOrderIds of our SL / TP legs - only these are ever cancelled
+
+
 class MultiPairScalpingTrader:
+    # Order side lookups so LONG/SHORT share a single code path
+    _ENTRY_SIDE = {'LONG': 'BUY', 'SHORT': 'SELL'}
+    _EXIT_SIDE = {'LONG': 'SELL', 'SHORT': 'BUY'}
+    _ORDER_TAG = 'sn'  # newClientOrderId prefix of our TP/SL legs: sn-SL-<pair>-<entry ts>
+    _DIRECTION_SIGN = {'LONG': 1.0, 'SHORT': -1.0}
+    # batchOrders errors meaning "the batch endpoint won't take these legs" (illegal batch param / order type).
+    # Anything else (5xx, -1003 rate limit, -1021 timestamp) may have been accepted - never resend on those
+    _BATCH_FALLBACK_CODES = frozenset({-1100, -1116})
+    _DUPLICATE_ORDER_ID = -4116  # a leg with this newClientOrderId is already live (earlier attempt of a retried batch)
+    # Fields an AI decision must carry before the cycle / executor index into it
+    _DECISION_FIELDS = frozenset({"pair", "action", "confidence"})
+    _TRADE_FIELDS = frozenset({"direction", "reason"})
+    _DECISION_ACTIONS = frozenset({"TRADE", "SKIP"})
+    
+    # Rule-based fallback thresholds (percent)
+    fallback_min_move = 0.2        # |1H change| that counts as a move
+    fallback_min_volatility = 0.5  # ATR volatility that counts as an active market
+    fallback_entry_score = 0.1     # |reversion score| needed to trade
+    # Pre-filter: pairs this flat are answered SKIP locally, without an LLM round trip
+    prefilter_min_move = 0.1       # |1H change| below this ...
+    prefilter_volume_band = 0.1    # ... with volume within ±10% of average = nothing to scalp
+    _PREFILTER_SKIP = {"action": "SKIP", "confidence": 40, "reason": "Pre-filter: flat price and volume"}
+    # Every fallback SKIP is identical - one shared read-only decision instead of a new dict per pair
+    _FALLBACK_SKIP = {"action": "SKIP", "confidence": 40, "reason": "Low volatility/opportunity for scalping"}
+    
     def __init__(self):
         # Load config from .env file
         self.binance_api_key = os.getenv('BINANCE_API_KEY')
@@ -27,78 +327,223 @@ class MultiPairScalpingTrader:
         # Multi-pair parameters
         self.max_concurrent_trades = 3
         self.available_pairs = []
-        self.active_trades = {}  # Dictionary to track multiple trades
+        self.active_trades = {}  # pair -> ActiveTrade
+        self._trades_lock = threading.Lock()  # user-data stream thread ကလည်း active_trades ကိုပြင်တယ်
+        self._pending_entries = set()  # pairs with an entry in flight - count against the slot limit
         self.blacklisted_pairs = ["BTCUSDT"]  # BTC ကိုထည့်မထားဘူး
         
         # Precision settings for different pairs
         self.quantity_precision = {}
         self.price_precision = {}
+        self.tick_size = {}  # PRICE_FILTER tickSize, cached so format_price never hits the API
+        self.min_notional = {}  # MIN_NOTIONAL filter, $20 assumed when unknown
+        self._symbol_generation = 0  # bumped whenever symbol metadata is reloaded
+        self._pair_set_cache = {}  # (frozenset(pairs), generation) -> (valid pairs, per-pair log lines)
+        
+        # futures_exchange_info cache (~1MB payload, symbol rules rarely change)
+        self._exchange_info = None
+        self._exchange_info_ts = 0
+        self.exchange_info_ttl = 3600
+        self._trading_symbols = frozenset()
+        self._symbol_info = {}     # symbol -> exchange_info symbol entry
+        self._symbol_filters = {}  # symbol -> {filterType: filter}
+        self._qty_round = {}
         
         # Auto pair selection parameters
         self.pair_rotation_hours = 6
         self.last_rotation_time = 0
         
+        # Last validated AI pair list - reused instead of asking DeepSeek again within the TTL
+        self._recommended_pairs = None
+        self._recommended_pairs_ts = 0
+        self.recommended_pairs_ttl = 5 * 3600
+        
+        # One pooled keep-alive session for every DeepSeek call
+        self._http = requests.Session()
+        self._http.headers.update({
+            "Authorization": f"Bearer {self.deepseek_key}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        })
+        # Reconnect quietly if DeepSeek closed an idle keep-alive socket, and retry rate-limit/overload
+        # answers (honouring Retry-After). Never after a read error - the model may already be generating
+        self._http.mount("https://", HTTPAdapter(
+            pool_connections=4, pool_maxsize=4,
+            max_retries=Retry(
+                total=2, connect=2, read=0, status=2, backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),  # chat completions have no side effects to duplicate
+                raise_on_status=False  # last error response is handled like any non-200
+            )
+        ))
+        
         # Initialize Binance client
-        self.binance = Client(self.binance_api_key, self.binance_secret)
+        # ping=False - the default spot ping warms the wrong host; warm_binance_client pings fapi instead
+        self.binance = warm_binance_client(pool_binance_session(
+            FastJSONClient(self.binance_api_key, self.binance_secret, ping=False)
+        ))
+        log.info("⏱️ Server time offset: %sms", self.binance.timestamp_offset)
         
-        print("🤖 MULTI-PAIR SCALPING BOT ACTIVATED!")
-        print(f"💵 Base Trade Size: ${self.trade_size_usd} (will adjust dynamically)")
-        print(f"📈 Max Concurrent Trades: {self.max_concurrent_trades}")
-        print(f"🎯 Take Profit: {self.scalp_take_profit*100}%")
-        print(f"🛡️ Stop Loss: {self.scalp_stop_loss*100}%")
-        print(f"🚫 Blacklisted: {self.blacklisted_pairs}")
+        self._current_leverage = {}  # symbol -> leverage on the account, so unchanged pairs are skipped
+        
+        # Worker pool for concurrent per-pair REST fetches (one client per worker thread)
+        self._market_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="market")
+        # Trade executions get their own pool - they fan out TP/SL legs onto _market_pool
+        self._execution_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_trades, thread_name_prefix="execute")
+        self._thread_local = threading.local()
+        
+        # Binance futures allows 10 orders/sec - stay a little under it
+        self._order_bucket = TokenBucket(rate=8, burst=10)
+        
+        # Negative cache - pairs with no data / no setup are skipped until this monotonic time
+        self._skip_until = {}
+        self.skip_seconds = 120
+        
+        # AI decisions per pair, reused while the market fingerprint is unchanged (max one 15m candle)
+        self._decision_cache = {}
+        self.decision_cache_ttl = 900
+        
+        # Shared websocket manager: user-data stream (fills) + kline multiplex stream (market data)
+        self._twm = None
+        self._user_socket = None
+        self._user_stream_active = False
+        self._market_socket = None
+        self._market_stream_pairs = frozenset()
+        self._kline_lock = threading.Lock()
+        self._kline_buffers = {}    # pair -> float64 array (rows: open_time, open, high, low, close, volume), last 20 x 15m
+        self._last_price = {}       # pair -> latest close pushed by the stream
+        self._stream_updated = {}   # pair -> monotonic time of the last stream message
+        self.stream_stale_seconds = 60  # older than this -> fall back to REST for the pair
+        self.kline_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kline_cache")
+        # Set by the stream on a 15m candle close or a sharp move since the last cycle - wakes the main loop
+        self._api_error = None  # last transient API error seen during the cycle (see _note_api_error)
+        self._market_wake = threading.Event()
+        self._cycle_prices = {}       # pair -> price the last cycle analysed
+        self.wake_price_move = 0.003  # 0.3% (well inside the 0.5% SL) counts as a sharp move
+        
+        log.info("🤖 MULTI-PAIR SCALPING BOT ACTIVATED!")
+        log.info("💵 Base Trade Size: $%s (will adjust dynamically)", self.trade_size_usd)
+        log.info("📈 Max Concurrent Trades: %s", self.max_concurrent_trades)
+        log.info("🎯 Take Profit: %s%%", self.scalp_take_profit*100)
+        log.info("🛡️ Stop Loss: %s%%", self.scalp_stop_loss*100)
+        log.info("🚫 Blacklisted: %s", self.blacklisted_pairs)
         
         self.validate_config()
         self.setup_futures()
         self.load_symbol_precision()
+        self.recover_active_trades()
+    
+    def recover_active_trades(self):
+        """Rebuild active_trades after a restart from open positions + our tagged TP/SL orders"""
+        try:
+            positions = self.binance.futures_position_information()
+            open_orders = self.binance.futures_get_open_orders()
+        except Exception as e:
+            log.error("❌ Trade recovery error: %s", e)
+            return
+        
+        # pair -> {'SL'/'TP': (order, entry ts)} for orders carrying our client id tag
+        legs = {}
+        for order in open_orders:
+            parts = order.get('clientOrderId', '').split('-')
+            if len(parts) == 4 and parts[0] == self._ORDER_TAG and parts[3].isdigit():
+                legs.setdefault(order['symbol'], {})[parts[1]] = (order, int(parts[3]))
+        
+        with self._trades_lock:
+            for position in positions:
+                pair = position['symbol']
+                amount = float(position['positionAmt'])
+                # Only positions we opened (tagged legs) - manual positions are left alone
+                if amount == 0 or pair not in legs or pair in self.active_trades:
+                    continue
+                pair_legs = legs[pair]
+                sl_order = pair_legs.get('SL', ({}, 0))[0]
+                tp_order = pair_legs.get('TP', ({}, 0))[0]
+                direction = 'LONG' if amount > 0 else 'SHORT'
+                entry_time = float(max(entry_ts for _, entry_ts in pair_legs.values()))
+                self.active_trades[pair] = ActiveTrade(
+                    pair=pair,
+                    direction=direction,
+                    entry_price=float(position['entryPrice']),
+                    quantity=abs(amount),
+                    stop_loss=float(sl_order.get('stopPrice', 0)),
+                    # TAKE_PROFIT_MARKET triggers at stopPrice - older LIMIT take-profits carry it in price
+                    take_profit=float(tp_order.get('stopPrice') or 0) or float(tp_order.get('price') or 0),
+                    entry_time=entry_time,
+                    confidence=0,
+                    exit_order_ids=tuple(order['clientOrderId'] for order, _ in pair_legs.values()),
+                    entry_mono=time.monotonic() - (time.time() - entry_time)
+                )
+                log.info("♻️ Recovered %s trade for %s from the exchange", direction, pair)
     
     def validate_config(self):
         """Check API keys"""
         if not all([self.binance_api_key, self.binance_secret, self.deepseek_key]):
-            print("❌ Missing API keys in .env file!")
+            log.error("❌ Missing API keys in .env file!")
             return False
         
         # Test Binance connection
         try:
-            self.binance.futures_exchange_info()
-            print("✅ Binance connection successful!")
+            self.get_exchange_info()
+            log.info("✅ Binance connection successful!")
         except Exception as e:
-            print(f"❌ Binance connection failed: {e}")
+            log.error("❌ Binance connection failed: %s", e)
             return False
             
-        print("✅ Configuration loaded successfully!")
+        log.info("✅ Configuration loaded successfully!")
         return True
     
+    def get_exchange_info(self):
+        """futures_exchange_info, re-fetched at most once per exchange_info_ttl seconds"""
+        if self._exchange_info is None or time.time() - self._exchange_info_ts > self.exchange_info_ttl:
+            exchange_info = self.binance.futures_exchange_info()
+            self._index_exchange_info(exchange_info)
+            self._exchange_info = exchange_info
+            self._exchange_info_ts = time.time()
+        return self._exchange_info
+    
+    def _index_exchange_info(self, exchange_info):
+        """Rebuild symbol/filter indexes, precision maps and the trading symbol set from a fresh exchange_info"""
+        self._symbol_info = {symbol['symbol']: symbol for symbol in exchange_info['symbols']}
+        self._symbol_filters = {
+            pair: {f['filterType']: f for f in symbol['filters']}
+            for pair, symbol in self._symbol_info.items()
+        }
+        
+        # (precision, integer-quantity?, step) per pair so get_quantity is a single lookup
+        qty_round = {}
+        for pair, filters in self._symbol_filters.items():
+            # Get quantity precision from LOT_SIZE filter
+            lot_size = filters.get('LOT_SIZE')
+            if lot_size:
+                precision = precision_from_step(lot_size['stepSize'])
+                self.quantity_precision[pair] = precision
+                qty_round[pair] = (precision, precision == 0, float(lot_size['stepSize']))
+            
+            # Get price precision from PRICE_FILTER
+            price_filter = filters.get('PRICE_FILTER')
+            if price_filter:
+                self.price_precision[pair] = precision_from_step(price_filter['tickSize'])
+                self.tick_size[pair] = float(price_filter['tickSize'])
+            
+            # Smallest order value the exchange accepts for this symbol
+            min_notional = filters.get('MIN_NOTIONAL')
+            if min_notional:
+                self.min_notional[pair] = float(min_notional.get('notional', min_notional.get('minNotional', 20)))
+        
+        self._trading_symbols = frozenset(
+            pair for pair, symbol in self._symbol_info.items() if symbol['status'] == 'TRADING'
+        )
+        self._qty_round = qty_round
+        self._symbol_generation += 1
+    
     def load_symbol_precision(self):
         """Load quantity and price precision for all trading pairs"""
         try:
-            exchange_info = self.binance.futures_exchange_info()
-            for symbol in exchange_info['symbols']:
-                pair = symbol['symbol']
-                
-                # Get quantity precision from LOT_SIZE filter
-                for f in symbol['filters']:
-                    if f['filterType'] == 'LOT_SIZE':
-                        step_size = f['stepSize']
-                        # Calculate precision from step size
-                        if '1' in step_size:
-                            qty_precision = 0
-                        else:
-                            qty_precision = len(step_size.split('.')[1].rstrip('0'))
-                        self.quantity_precision[pair] = qty_precision
-                    
-                    # Get price precision from PRICE_FILTER
-                    elif f['filterType'] == 'PRICE_FILTER':
-                        tick_size = f['tickSize']
-                        if '1' in tick_size:
-                            price_precision = 0
-                        else:
-                            price_precision = len(tick_size.split('.')[1].rstrip('0'))
-                        self.price_precision[pair] = price_precision
-            
-            print("✅ Symbol precision loaded for all pairs")
+            self.get_exchange_info()
+            log.info("✅ Symbol precision loaded for all pairs")
         except Exception as e:
-            print(f"❌ Error loading symbol precision: {e}")
+            log.error("❌ Error loading symbol precision: %s", e)
     
     def get_dynamic_trade_size(self, pair, price):
         """Smart trade sizing based on pair price"""
@@ -113,49 +558,57 @@ class MultiPairScalpingTrader:
             return 50
 
     def get_quantity(self, pair, price):
-        """FIXED - Smart quantity calculation with dynamic sizing"""
-        try:
-            # Get smart trade size based on pair price
-            trade_size = self.get_dynamic_trade_size(pair, price)
-            
-            # Calculate quantity
-            quantity = trade_size / price
-            precision = self.quantity_precision.get(pair, 2)
-            quantity = round(quantity, precision)
-            if precision == 0:
-                quantity = int(quantity)
-            
-            # Binance futures minimum order value is $20
-            min_order_value = 20
-            trade_value = quantity * price
-            
-            # Ensure we meet Binance minimum
-            if trade_value < min_order_value:
-                print(f"⚠️ Below Binance minimum: ${trade_value:.2f} < ${min_order_value}")
-                min_quantity = min_order_value / price
-                quantity = round(min_quantity, precision)
-                if precision == 0:
-                    quantity = int(quantity)
-                trade_value = quantity * price
-                print(f"🚀 Adjusted to meet minimum: {quantity} = ${trade_value:.2f}")
-            
-            # Final check for symbol minimum quantity
-            symbol_min = self.get_minimum_quantity(pair)
-            if quantity < symbol_min:
-                quantity = symbol_min
-                trade_value = quantity * price
-                print(f"📏 Using symbol minimum: {quantity} = ${trade_value:.2f}")
-            
-            print(f"💰 {pair}: {quantity} = ${trade_value:.2f} (Trade Size: ${trade_size})")
-            return quantity
-            
-        except Exception as e:
-            print(f"❌ Quantity calculation error for {pair}: {e}")
-            # Emergency fallback
-            return self.get_minimum_quantity(pair)
+        """Quantity for the pair's dynamic trade size, rounded to its lot precision"""
+        precision, as_int, step = self._qty_round.get(pair, (2, False, 0.01))
+        # Floor to a whole number of lot steps (never size past the trade size), then round away
+        # the float noise (0.30000000000000004) - round(.., 9) first so 2.9999999999 counts as 3 steps
+        steps = math.floor(round(self.get_dynamic_trade_size(pair, price) / price / step, 9))
+        quantity = round(steps * step, precision)
+        if as_int:
+            quantity = int(quantity)
+        
+        # Rare: rounding pushed us under the order value minimum or the symbol's minQty
+        if quantity * price < self.min_notional.get(pair, 20) or quantity < self.get_minimum_quantity(pair):
+            quantity = self._get_minimum_order_quantity(pair, price, precision, as_int, step)
+            if quantity is None:
+                return None
+        
+        log.debug("💰 %s: %s = $%.2f", pair, quantity, quantity * price)
+        return quantity
+    
+    def _get_minimum_order_quantity(self, pair, price, precision, as_int, step):
+        """Smallest quantity meeting the order value and symbol minimums, None if that oversizes the trade (cold path)"""
+        # Binance futures minimum order value (MIN_NOTIONAL filter, $20 if unknown)
+        min_order_value = self.min_notional.get(pair, 20)
+        # Round UP to the lot step - nearest/down can land under MIN_NOTIONAL (20 @ 3.7 -> 5 = $18.5, -4164)
+        quantity = round(math.ceil(round(min_order_value / price / step, 9)) * step, precision)
+        if quantity * price < min_order_value:
+            quantity = round(quantity + step, precision)  # float noise left it a hair short
+        if as_int:
+            quantity = int(quantity)
+        log.warning("⚠️ Below Binance minimum, adjusted %s to %s = $%.2f", pair, quantity, quantity * price)
+        
+        # Final check for symbol minimum quantity
+        symbol_min = self.get_minimum_quantity(pair)
+        if quantity < symbol_min:
+            quantity = symbol_min
+            log.debug("📏 Using symbol minimum: %s = $%.2f", quantity, quantity * price)
+        
+        # Don't size past the configured trade size - reject here instead of burning margin / an order round trip
+        trade_size = self.get_dynamic_trade_size(pair, price)
+        if quantity * price > trade_size:
+            log.warning("⚠️ %s minimum order $%.2f exceeds trade size $%s, skipping", pair, quantity * price, trade_size)
+            return None
+        return quantity
     
     def get_minimum_quantity(self, pair):
         """Get minimum quantity for a pair based on Binance requirements"""
+        # Exchange LOT_SIZE minQty when we have it (indexed once per exchange_info refresh)
+        lot_size = self._symbol_filters.get(pair, {}).get('LOT_SIZE')
+        if lot_size:
+            min_qty = float(lot_size['minQty'])
+            return int(min_qty) if self.quantity_precision.get(pair) == 0 else min_qty
+        
         min_quantities = {
             'ADAUSDT': 1, 'XRPUSDT': 1, 'DOGEUSDT': 1, 'TRXUSDT': 1,
             'ETHUSDT': 0.001, 'BNBUSDT': 0.01, 'SOLUSDT': 0.01,
@@ -165,8 +618,12 @@ class MultiPairScalpingTrader:
         return min_quantities.get(pair, 0.01)
     
     def format_price(self, pair, price):
-        """Format price according to symbol precision"""
+        """Format price according to symbol precision (cached tick size, no network I/O)"""
         precision = self.price_precision.get(pair, 4)
+        tick = self.tick_size.get(pair)
+        if tick:
+            # Snap to the tick grid - ticks like 0.05 aren't covered by decimal rounding alone
+            price = round_to_tick(price, tick)
         return round(price, precision)
     
     def setup_futures(self):
@@ -174,22 +631,60 @@ class MultiPairScalpingTrader:
         try:
             # Initial pairs without BTC
             initial_pairs = ["ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "AVAXUSDT"]
-            for pair in initial_pairs:
-                try:
-                    self.binance.futures_change_leverage(
-                        symbol=pair,
-                        leverage=self.leverage
-                    )
-                    print(f"✅ Leverage set for {pair}")
-                except Exception as e:
-                    print(f"⚠️ Leverage setup failed for {pair}: {e}")
-            print("✅ Futures setup completed!")
+            self.load_current_leverage()
+            for pair in self.set_leverage_for_pairs(initial_pairs):
+                log.info("✅ Leverage set for %s", pair)
+            log.info("✅ Futures setup completed!")
+        except Exception as e:
+            log.error("❌ Futures setup failed: %s", e)
+    
+    def load_current_leverage(self):
+        """Read every symbol's current leverage in one account call"""
+        try:
+            account = self.binance.futures_account()
+            self._current_leverage = {
+                p['symbol']: int(p['leverage']) for p in account.get('positions', []) if 'leverage' in p
+            }
         except Exception as e:
-            print(f"❌ Futures setup failed: {e}")
+            log.warning("⚠️ Could not read current leverage: %s", e)
+    
+    def set_leverage_for_pairs(self, pairs):
+        """Set leverage concurrently for pairs not already at self.leverage -> list of pairs that are set"""
+        already_set = [pair for pair in pairs if self._current_leverage.get(pair) == self.leverage]
+        to_change = [pair for pair in pairs if pair not in already_set]
+        changed = [pair for pair, ok in self._market_pool.map(self._set_leverage_on_worker, to_change) if ok]
+        return already_set + changed
+    
+    def _set_leverage_on_worker(self, pair):
+        """futures_change_leverage on the worker thread's own client -> (pair, ok)"""
+        try:
+            self._thread_client().futures_change_leverage(symbol=pair, leverage=self.leverage)
+            self._current_leverage[pair] = self.leverage
+            return pair, True
+        except Exception as e:
+            log.warning("⚠️ Leverage setup failed for %s: %s", pair, e)
+            self._note_api_error(e)
+            return pair, False
+    
+    def _cached_recommended_pairs(self):
+        """Validated AI pairs from the last successful recommendation, or None once the TTL has passed"""
+        if self._recommended_pairs and time.time() - self._recommended_pairs_ts < self.recommended_pairs_ttl:
+            return list(self._recommended_pairs)
+        return None
+    
+    def _remember_recommended_pairs(self, pairs):
+        self._recommended_pairs = list(pairs)
+        self._recommended_pairs_ts = time.time()
     
     def get_ai_recommended_pairs(self):
         """AI ကနေ BTC မပါတဲ့ scalping pairs တွေရွေးခိုင်းခြင်း"""
-        print("🤖 AI က BTC မပါတဲ့ scalping pairs တွေရွေးနေပါတယ်...")
+        cached = self._cached_recommended_pairs()
+        if cached:
+            log.info("♻️ Reusing recent AI pair recommendation: %s", cached)
+            self.set_leverage_for_pairs(cached)  # pairs already at self.leverage cost no API call
+            return cached
+        
+        log.info("🤖 AI က BTC မပါတဲ့ scalping pairs တွေရွေးနေပါတယ်...")
         
         prompt = """
         BINANCE FUTURES SCALPING PAIR RECOMMENDATIONS (EXCLUDE BTCUSDT):
@@ -204,7 +699,7 @@ class MultiPairScalpingTrader:
         - Exclude BTC completely
         
         Recommend 6-10 best altcoin pairs for scalping from Binance futures.
-        Focus on ETH, BNB, SOL, ADA, XRP, DOT, MATIC, AVAX, LINK, etc.
+        Focus on ETH, BNB, SOL, ADA, XRP, DOT, POL, AVAX, LINK, etc.
         
         RESPONSE (JSON only):
         {
@@ -216,85 +711,117 @@ class MultiPairScalpingTrader:
         """
         
         try:
-            headers = {
-                "Authorization": f"Bearer {self.deepseek_key}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "model": "deepseek-chat",
                 "messages": [{"role": "user", "content": prompt}],
                 "temperature": 0.3,
-                "max_tokens": 500
+                "max_tokens": 500,
+                "response_format": {"type": "json_object"}  # JSON mode - no prose around the object
             }
             
-            response = requests.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
+            response = self._http.post(
+                DEEPSEEK_URL,
+                data=json_dumps(payload),  # Content-Type is set on the session
                 timeout=20
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 content = result['choices'][0]['message']['content']
                 
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    recommendation = json.loads(json_match.group())
+                recommendation = extract_json_object(content)
+                if recommendation:
                     pairs = recommendation.get("recommended_pairs", [])
                     
                     # Remove BTC if AI accidentally includes it
                     pairs = [p for p in pairs if p != "BTCUSDT"]
                     
-                    print(f"✅ AI Recommended Pairs (No BTC): {pairs}")
-                    print(f"📝 Reason: {recommendation.get('reason', '')}")
+                    log.info("✅ AI Recommended Pairs (No BTC): %s", pairs)
+                    log.info("📝 Reason: %s", recommendation.get('reason', ''))
                     
                     # Validate if pairs exist in Binance
                     valid_pairs = self.validate_ai_pairs(pairs)
+                    if valid_pairs:
+                        self._remember_recommended_pairs(valid_pairs)
+                        self.set_leverage_for_pairs(valid_pairs)
                     return valid_pairs
             
         except Exception as e:
-            print(f"❌ AI pair selection error: {e}")
+            log.error("❌ AI pair selection error: %s", e)
+            self._note_api_error(e)
         
         # Fallback to default pairs without BTC
-        fallback_pairs = ["ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "AVAXUSDT", "MATICUSDT"]
-        print(f"🔄 Using fallback pairs (No BTC): {fallback_pairs}")
-        return fallback_pairs
+        # MATICUSDT was delisted from futures (migrated to POL) - validated too, so a dead symbol
+        # can't cost failed ticker/kline/leverage calls every cycle
+        fallback_pairs = ["ETHUSDT", "BNBUSDT", "SOLUSDT", "ADAUSDT", "XRPUSDT", "AVAXUSDT", "POLUSDT"]
+        log.info("🔄 Using fallback pairs (No BTC): %s", fallback_pairs)
+        valid_pairs = self.validate_ai_pairs(fallback_pairs)
+        self.set_leverage_for_pairs(valid_pairs)
+        return valid_pairs
     
     def validate_ai_pairs(self, ai_pairs):
         """AI ရွေးတဲ့ pairs တွေ Binance မှာရှိမရှိစစ်ဆေးခြင်း"""
-        valid_pairs = []
-        
         try:
-            # Get all available futures pairs from Binance
-            exchange_info = self.binance.futures_exchange_info()
-            all_symbols = [symbol['symbol'] for symbol in exchange_info['symbols']]
-            
-            for pair in ai_pairs:
-                if pair in all_symbols and pair not in self.blacklisted_pairs:
-                    # Check if pair is trading and has required leverage
-                    for symbol in exchange_info['symbols']:
-                        if symbol['symbol'] == pair and symbol['status'] == 'TRADING':
-                            valid_pairs.append(pair)
-                            print(f"✅ {pair} is available for trading")
-                            break
-                    else:
-                        print(f"⚠️ {pair} exists but not trading")
-                else:
-                    print(f"❌ {pair} not available or blacklisted")
-        
+            self.get_exchange_info()  # refresh first if stale so the generation below is current
+            valid_set = self._validate_pair_set(ai_pairs)
         except Exception as e:
-            print(f"❌ Pair validation error: {e}")
+            log.error("❌ Pair validation error: %s", e)
+            self._note_api_error(e)
             # Fallback to first 8 AI pairs assuming they're valid
             return ai_pairs[:8]
         
-        print(f"🎯 Final Validated Pairs: {valid_pairs}")
+        valid_pairs = [pair for pair in ai_pairs if pair in valid_set]
+        log.info("🎯 Final Validated Pairs: %s", valid_pairs)
         return valid_pairs[:10]  # Maximum 10 pairs for selection pool
     
+    def _validate_pair_set(self, pairs):
+        """Check pairs against Binance - the verdicts are memoized per symbol-metadata generation"""
+        key = (frozenset(pairs), self._symbol_generation)
+        cached = self._pair_set_cache.get(key)
+        if cached is None:
+            if len(self._pair_set_cache) >= 32:
+                self._pair_set_cache.clear()  # mostly stale generations by now
+            cached = self._pair_set_cache[key] = self._check_pair_set(key[0])
+        
+        valid_pairs, notes = cached
+        # A cache hit still reports every pair, so an invalid AI pick is never dropped silently
+        for level, message, pair in notes:
+            log.log(level, message, pair)
+        return valid_pairs
+    
+    def _check_pair_set(self, pairs):
+        """(valid pairs, per-pair log lines) for a set of pairs"""
+        valid_pairs = set()
+        notes = []
+        
+        # Trading symbol set is rebuilt whenever the cached exchange_info refreshes
+        for pair in sorted(pairs):
+            if pair in self._trading_symbols and pair not in self.blacklisted_pairs:
+                # Sizing is in USDT (trade_size_usd) - other quote assets would be mis-sized
+                if self._symbol_info[pair].get('quoteAsset') != 'USDT':
+                    notes.append((logging.WARNING, "⚠️ %s is not USDT-quoted, skipping", pair))
+                    continue
+                valid_pairs.add(pair)
+                notes.append((logging.INFO, "✅ %s is available for trading", pair))
+            elif pair in self._symbol_info and pair not in self.blacklisted_pairs:
+                notes.append((logging.WARNING, "⚠️ %s exists but not trading", pair))
+            else:
+                notes.append((logging.ERROR, "❌ %s not available or blacklisted", pair))
+        
+        return frozenset(valid_pairs), tuple(notes)
+    
     def rotate_pairs_based_on_performance(self):
         """စျေးကွက်အခြေအနေအရ pairs တွေကိုလည်ပတ်ရွေးချယ်ခြင်း"""
-        print("🔄 Rotating pairs based on current market conditions...")
+        log.info("🔄 Rotating pairs based on current market conditions...")
+        
+        cached = self._cached_recommended_pairs()
+        if cached:
+            # A recommendation made within the TTL is still current - skip the LLM round-trip
+            log.info("♻️ Recent AI recommendation still valid, keeping: %s", cached)
+            self.available_pairs = cached
+            # Pairs rotating in from the cache must trade at the configured leverage too
+            self.set_leverage_for_pairs(cached)
+            return True
         
         market_condition_prompt = """
         Analyze current crypto market and recommend best scalping pairs for NEXT 6 HOURS.
@@ -321,32 +848,26 @@ class MultiPairScalpingTrader:
         """
         
         try:
-            headers = {
-                "Authorization": f"Bearer {self.deepseek_key}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "model": "deepseek-chat",
                 "messages": [{"role": "user", "content": market_condition_prompt}],
                 "temperature": 0.4,
-                "max_tokens": 600
+                "max_tokens": 600,
+                "response_format": {"type": "json_object"}
             }
             
-            response = requests.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
+            response = self._http.post(
+                DEEPSEEK_URL,
+                data=json_dumps(payload),  # Content-Type is set on the session
                 timeout=25
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 content = result['choices'][0]['message']['content']
                 
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    market_analysis = json.loads(json_match.group())
+                market_analysis = extract_json_object(content)
+                if market_analysis:
                     new_pairs = market_analysis.get("recommended_pairs", [])
                     
                     # Remove BTC if included
@@ -357,26 +878,21 @@ class MultiPairScalpingTrader:
                         if valid_pairs:
                             old_pairs = self.available_pairs.copy()
                             self.available_pairs = valid_pairs
+                            self._remember_recommended_pairs(valid_pairs)
                             
                             # Setup leverage for new pairs
-                            for pair in valid_pairs:
-                                try:
-                                    self.binance.futures_change_leverage(
-                                        symbol=pair,
-                                        leverage=self.leverage
-                                    )
-                                except Exception as e:
-                                    print(f"⚠️ Leverage setup failed for {pair}: {e}")
+                            self.set_leverage_for_pairs(valid_pairs)
                             
-                            print(f"🔄 Successfully rotated pairs!")
-                            print(f"   Old: {old_pairs}")
-                            print(f"   New: {valid_pairs}")
-                            print(f"📈 Market Condition: {market_analysis.get('market_condition', 'unknown')}")
-                            print(f"🎯 Strategy: {market_analysis.get('strategy', '')}")
+                            log.info("🔄 Successfully rotated pairs!")
+                            log.info("   Old: %s", old_pairs)
+                            log.info("   New: %s", valid_pairs)
+                            log.info("📈 Market Condition: %s", market_analysis.get('market_condition', 'unknown'))
+                            log.info("🎯 Strategy: %s", market_analysis.get('strategy', ''))
                             return True
         
         except Exception as e:
-            print(f"❌ Pair rotation error: {e}")
+            log.error("❌ Pair rotation error: %s", e)
+            self._note_api_error(e)
         
         return False
     
@@ -388,7 +904,7 @@ class MultiPairScalpingTrader:
         if (current_time - self.last_rotation_time > self.pair_rotation_hours * 3600 or 
             not self.available_pairs):
             
-            print(f"🕒 Time for pair rotation...")
+            log.info("🕒 Time for pair rotation...")
             success = self.rotate_pairs_based_on_performance()
             
             if success:
@@ -403,470 +919,797 @@ class MultiPairScalpingTrader:
         market_data = {}
         
         if not self.available_pairs:
-            print("⚠️ No pairs available, getting new pairs...")
+            log.warning("⚠️ No pairs available, getting new pairs...")
             self.available_pairs = self.get_ai_recommended_pairs()
         
-        for pair in self.available_pairs:
-            try:
-                # Skip if this pair already has active trade
-                if pair in self.active_trades:
-                    continue
-                    
-                # Get current price
-                ticker = self.binance.futures_symbol_ticker(symbol=pair)
-                price = float(ticker['price'])
-                
-                # Get klines for analysis
-                klines = self.binance.futures_klines(
-                    symbol=pair,
-                    interval=Client.KLINE_INTERVAL_15MINUTE,
-                    limit=20
-                )
-                
-                if len(klines) > 0:
-                    closes = [float(k[4]) for k in klines]
-                    volumes = [float(k[5]) for k in klines]
-                    highs = [float(k[2]) for k in klines]
-                    lows = [float(k[3]) for k in klines]
-                    
-                    # Calculate metrics
-                    current_volume = volumes[-1] if volumes else 0
-                    avg_volume = np.mean(volumes[-10:]) if len(volumes) >= 10 else current_volume
-                    
-                    # Price change calculations
-                    price_change_1h = ((closes[-1] - closes[-4]) / closes[-4]) * 100 if len(closes) >= 4 else 0
-                    price_change_4h = ((closes[-1] - closes[-16]) / closes[-16]) * 100 if len(closes) >= 16 else 0
-                    
-                    # Volatility (ATR-like calculation)
-                    true_ranges = []
-                    for i in range(1, min(14, len(klines))):
-                        high = highs[i]
-                        low = lows[i]
-                        prev_close = closes[i-1]
-                        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-                        true_ranges.append(tr)
-                    
-                    atr = np.mean(true_ranges) if true_ranges else 0
-                    volatility = (atr / price) * 100 if price > 0 else 0
-                    
-                    market_data[pair] = {
-                        'price': price,
-                        'change_1h': price_change_1h,
-                        'change_4h': price_change_4h,
-                        'volume_ratio': current_volume / avg_volume if avg_volume > 0 else 1,
-                        'volatility': volatility,
-                        'high_1h': max(highs[-4:]) if len(highs) >= 4 else price,
-                        'low_1h': min(lows[-4:]) if len(lows) >= 4 else price
-                    }
-                
-            except Exception as e:
-                print(f"❌ Market data error for {pair}: {e}")
-                continue
-                
+        # Skip pairs that already have an active trade or were recently unproductive
+        now = time.monotonic()
+        with self._trades_lock:
+            active = set(self.active_trades)  # the user-stream thread completes trades concurrently
+        pairs_to_fetch = [
+            pair for pair in self.available_pairs
+            if pair not in active and self._skip_until.get(pair, 0) <= now
+        ]
+        
+        # Pairs with a live kline stream are read from memory; the rest go to REST
+        self.sync_market_streams()
+        rest_pairs = []
+        for pair in pairs_to_fetch:
+            data = self._market_data_from_stream(pair)
+            if data is None:
+                rest_pairs.append(pair)
+            else:
+                market_data[pair] = data
+        
+        # Fetch the remaining pairs concurrently - each worker blocks on its own HTTP round-trip
+        for pair, data in self._market_pool.map(self._fetch_pair_data, rest_pairs):
+            if data is not None:
+                market_data[pair] = data
+            else:
+                # No usable data - don't ask again every cycle
+                self._skip_until[pair] = now + self.skip_seconds
+        
+        # Baseline for the stream's sharp-move wake-up (swapped whole - the stream thread reads it)
+        self._cycle_prices = {pair: data['price'] for pair, data in market_data.items()}
         return market_data
     
-    def get_scalping_decision(self, market_data):
-        """Scalping-optimized AI decision for both LONG and SHORT"""
-        pair = list(market_data.keys())[0]
-        data = market_data[pair]
-        price = data['price']
+    def _fetch_pair_data(self, pair):
+        """Fetch klines for one pair and compute metrics -> (pair, dict|None)"""
+        try:
+            # Stale stream buffer -> only the candles since its last one are downloaded
+            with self._kline_lock:
+                buffer = self._kline_buffers.get(pair)
+                cached = buffer.copy() if buffer is not None else None
+            
+            klines = self._fetch_kline_window(pair, cached)
+            if klines is None:
+                return pair, None
+            with self._kline_lock:
+                self._kline_buffers[pair] = klines  # next cycle's delta starts here (stream writes resume in place)
+            
+            # Current price = close of the still-forming last candle (the last trade) - no separate ticker call
+            price = float(klines[-1, 4])
+            
+            return pair, self._compute_market_metrics(price, klines)
+            
+        except Exception as e:
+            log.error("❌ Market data error for %s: %s", pair, e)
+            self._note_api_error(e)
+            return pair, None
+    
+    def _market_data_from_stream(self, pair):
+        """Metrics from the in-memory kline buffer, or None if the stream is stale for this pair"""
+        with self._kline_lock:
+            updated = self._stream_updated.get(pair)
+            if updated is None or time.monotonic() - updated > self.stream_stale_seconds:
+                return None
+            klines = self._kline_buffers[pair].copy()  # snapshot - the stream thread writes in place
+            price = self._last_price[pair]
         
-        prompt = f"""
-        URGENT SCALPING ANALYSIS FOR {pair} (ALTCOIN):
+        try:
+            return self._compute_market_metrics(price, klines)
+        except Exception as e:
+            log.error("❌ Stream market data error for %s: %s", pair, e)
+            return None
+    
+    def _compute_market_metrics(self, price, klines):
+        """Scalping metrics from 15m klines (REST rows or a stream buffer - same column layout)"""
+        # One shape check up front - 16 candles cover every lookback below (4h = 16 x 15m)
+        if len(klines) < 16:
+            return None
         
-        CURRENT MARKET DATA:
-        - Price: ${price}
-        - 1H Change: {data.get('change_1h', 0):.2f}%
-        - 4H Change: {data.get('change_4h', 0):.2f}%
-        - Volume Ratio: {data.get('volume_ratio', 1):.2f}x
-        - Volatility: {data.get('volatility', 0):.2f}%
-        - 1H Range: ${data.get('low_1h', price):.2f} - ${data.get('high_1h', price):.2f}
+        arr = np.asarray(klines, dtype=np.float64)
+        highs, lows, closes, volumes = arr[:, 2], arr[:, 3], arr[:, 4], arr[:, 5]
         
-        SCALPING STRATEGY - BOTH LONG & SHORT:
-        LONG opportunities:
-        - Price near support levels ({data.get('low_1h', price):.2f})
-        - Oversold conditions (recent dip)
-        - Positive momentum reversal
-        - High volume buying
+        # Calculate metrics
+        current_volume = volumes[-1]
+        avg_volume = volumes[-10:].mean()
         
-        SHORT opportunities:  
-        - Price near resistance levels ({data.get('high_1h', price):.2f})
-        - Overbought conditions (recent pump)
-        - Negative momentum reversal  
-        - High volume selling
+        # Price change calculations
+        price_change_1h = (closes[-1] - closes[-4]) / closes[-4] * 100
+        price_change_4h = (closes[-1] - closes[-16]) / closes[-16] * 100
         
-        Analyze for IMMEDIATE scalping entry within next 1-5 candles.
-        Recommend SHORT if bearish signals are stronger than bullish.
+        # Volatility - ATR over the latest 13 true ranges, computed in one vectorised pass
+        prev_closes = closes[:-1]
+        true_ranges = np.maximum.reduce([
+            highs[1:] - lows[1:],
+            np.abs(highs[1:] - prev_closes),
+            np.abs(lows[1:] - prev_closes),
+        ])
+        atr = true_ranges[-13:].mean()
+        volatility = (atr / price) * 100 if price > 0 else 0
         
-        RESPONSE (JSON only):
-        {{
-            "action": "TRADE/SKIP",
-            "pair": "{pair}",
-            "direction": "LONG/SHORT",
-            "entry_price": {price},
-            "stop_loss": number,
-            "take_profit": number,
-            "position_size_usd": {self.trade_size_usd},
-            "confidence": 0-100,
-            "timeframe": "5-30min",
-            "reason": "Specific LONG/SHORT technical reason...",
-            "urgency": "high/medium/low"
-        }}
-        """
+        # Plain floats out - keeps numpy scalars away from JSON/prompt formatting
+        return {
+            'price': price,
+            'change_1h': float(price_change_1h),
+            'change_4h': float(price_change_4h),
+            'volume_ratio': float(current_volume / avg_volume) if avg_volume > 0 else 1,
+            'volatility': float(volatility),
+            'high_1h': float(highs[-4:].max()),
+            'low_1h': float(lows[-4:].min())
+        }
+    
+    def _note_api_error(self, e):
+        """Remember a rate limit / 5xx / network error a helper swallowed, so the main loop backs off"""
+        if is_transient_error(e):
+            self._api_error = e
+    
+    def _thread_client(self):
+        """Per-thread Binance client (Client stores the last response on self, so it isn't thread-safe)"""
+        client = getattr(self._thread_local, 'binance', None)
+        if client is None:
+            client = pool_binance_session(FastJSONClient(self.binance_api_key, self.binance_secret, ping=False))
+            client.timestamp_offset = self.binance.timestamp_offset  # reuse the startup clock sync
+            self._thread_local.binance = client
+        return client
+    
+    @staticmethod
+    def _market_fingerprint(data):
+        """Coarse market state - equal fingerprints would get the same AI answer"""
+        return (
+            round(data.get('change_1h', 0), 1),
+            round(data.get('change_4h', 0), 1),
+            round(data.get('volume_ratio', 1), 1),
+            round(data.get('volatility', 0), 2),
+        )
+    
+    def get_scalping_decision(self, market_data):
+        """Scalping-optimized AI decisions (LONG and SHORT) for every pair in one request -> {pair: decision}"""
+        decisions = {}
+        fingerprints = {}
+        now = time.monotonic()
         
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.deepseek_key}",
-                "Content-Type": "application/json"
-            }
+        # Pairs whose market state hasn't moved since the last answer reuse it - only the rest go to DeepSeek
+        pending = {}
+        for pair, data in market_data.items():
+            if (abs(data.get('change_1h', 0)) < self.prefilter_min_move
+                    and abs(data.get('volume_ratio', 1) - 1) < self.prefilter_volume_band):
+                decisions[pair] = self._PREFILTER_SKIP
+                continue
             
+            fingerprint = self._market_fingerprint(data)
+            cached = self._decision_cache.get(pair)
+            if cached and cached[0] == fingerprint and now - cached[2] < self.decision_cache_ttl:
+                decisions[pair] = cached[1]
+                log.debug("♻️ %s: reusing AI decision (%s)", pair, cached[1]['action'])
+            else:
+                fingerprints[pair] = fingerprint
+                pending[pair] = data
+        
+        if pending:
+            decisions.update(self._request_scalping_decisions(pending, fingerprints, now))
+        
+        # Fallback to scalping logic for any pair the AI didn't answer
+        for pair, data in market_data.items():
+            if pair not in decisions:
+                decisions[pair] = self.get_scalping_fallback({pair: data})
+        return decisions
+    
+    def _is_complete_decision(self, decision):
+        """True if an AI decision carries every field the cycle / executor use, with usable values"""
+        if not self._DECISION_FIELDS.issubset(decision):
+            return False
+        action, confidence = decision["action"], decision["confidence"]
+        # isinstance first - an unhashable value would raise in the set lookups
+        if not isinstance(action, str) or action not in self._DECISION_ACTIONS:
+            return False
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            return False  # "85" would TypeError at the confidence >= 65 comparison
+        if action == "TRADE":
+            direction = decision.get("direction")
+            return self._TRADE_FIELDS.issubset(decision) and isinstance(direction, str) and direction in self._DIRECTION_SIGN
+        return True
+
+    def _request_scalping_decisions(self, market_data, fingerprints, now):
+        """One DeepSeek request for every pair in market_data -> {pair: decision} (AI answers only)"""
+        pair_lines = []
+        for pair, data in market_data.items():
+            price = data['price']
+            pair_lines.append(_SCALP_PAIR_LINE_TMPL.format(
+                pair=pair,
+                price=price,
+                decimals=self.price_precision.get(pair, 4),  # tick precision - no float noise, no 1e-05 notation
+                change_1h=data.get('change_1h', 0),
+                change_4h=data.get('change_4h', 0),
+                volume_ratio=data.get('volume_ratio', 1),
+                volatility=data.get('volatility', 0),
+                low_1h=data.get('low_1h', price),
+                high_1h=data.get('high_1h', price)
+            ))
+        
+        prompt = _SCALP_PROMPT_TMPL.format(
+            count=len(market_data),
+            pair_lines="\n".join(pair_lines),
+            trade_size_usd=self.trade_size_usd
+        )
+        
+        decisions = {}
+        try:
             payload = {
                 "model": "deepseek-chat",
                 "messages": [{"role": "user", "content": prompt}],
                 "temperature": 0.2,
-                "max_tokens": 500
+                "max_tokens": min(4000, 200 + 250 * len(market_data)),  # ~250 tokens per decision
+                "response_format": {"type": "json_object"},  # JSON mode - the object starts at the first token
+                "stream": True  # act on the decisions object as soon as it closes, not at end of completion
             }
             
-            response = requests.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
+            with self._http.post(
+                DEEPSEEK_URL,
+                data=json_dumps(payload),  # Content-Type is set on the session
+                timeout=30,
+                stream=True
+            ) as response:
+                # Leaving the block closes the connection if the model is still talking
+                reply = read_streamed_json_object(response) if response.status_code == 200 else None
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    decision = json.loads(json_match.group())
-                    print(f"🤖 {pair}: {decision['action']} ({decision['confidence']}% confidence)")
+            if reply:
+                for decision in reply.get("decisions", []):
+                    # Non-string pair (e.g. a list) can't be looked up - that pair just gets the fallback
+                    if not isinstance(decision, dict) or not isinstance(decision.get("pair"), str):
+                        continue
+                    pair = decision["pair"]
+                    if pair not in market_data:
+                        continue
+                    if not self._is_complete_decision(decision):
+                        # Missing fields / wrong types would raise later in the cycle - let the rule-based fallback answer instead
+                        log.warning("⚠️ Incomplete AI decision for %s, using fallback: %s", pair, decision)
+                        continue
+                    log.info("🤖 %s: %s (%s%% confidence)", pair, decision['action'], decision['confidence'])
                     if decision['action'] == 'TRADE':
-                        print(f"   📈 Direction: {decision['direction']}")
-                        print(f"   🎯 Reason: {decision['reason']}")
-                        print(f"   ⚡ Urgency: {decision.get('urgency', 'medium')}")
-                    return decision
+                        log.info("   📈 Direction: %s", decision['direction'])
+                        log.info("   🎯 Reason: %s", decision['reason'])
+                        log.info("   ⚡ Urgency: %s", decision.get('urgency', 'medium'))
+                    decisions[pair] = decision
+                    self._decision_cache[pair] = (fingerprints[pair], decision, now)
             
         except Exception as e:
-            print(f"❌ AI API Error for {pair}: {e}")
+            log.error("❌ AI API Error: %s", e)
+            self._note_api_error(e)
+            decisions = {}
         
-        # Fallback to scalping logic
-        return self.get_scalping_fallback(market_data)
+        return decisions
     
     def get_scalping_fallback(self, market_data):
-        """Scalping fallback logic with both LONG and SHORT"""
-        pair = list(market_data.keys())[0]
+        """Deterministic rule-based scalp (LONG and SHORT) used when the AI gives no decision"""
+        pair = next(iter(market_data))
         data = market_data[pair]
         price = data['price']
         change_1h = data.get('change_1h', 0)
         volatility = data.get('volatility', 0)
         
-        # More sensitive scalping triggers for auto-trading
-        if abs(change_1h) > 0.2 or volatility > 0.5:
-            if change_1h < -0.1:  # Recent dip - LONG opportunity
-                return {
-                    "action": "TRADE",
-                    "pair": pair,
-                    "direction": "LONG",
-                    "entry_price": price,
-                    "stop_loss": round(price * (1 - self.scalp_stop_loss), 4),
-                    "take_profit": round(price * (1 + self.scalp_take_profit), 4),
-                    "position_size_usd": self.trade_size_usd,
-                    "confidence": 65,
-                    "timeframe": "10-20min",
-                    "reason": f"Quick bounce scalping: {pair} dipped {change_1h:.2f}%",
-                    "urgency": "high"
-                }
-            elif change_1h > 0.1:  # Recent pump - SHORT opportunity
-                return {
-                    "action": "TRADE",
-                    "pair": pair,
-                    "direction": "SHORT", 
-                    "entry_price": price,
-                    "stop_loss": round(price * (1 + self.scalp_stop_loss), 4),
-                    "take_profit": round(price * (1 - self.scalp_take_profit), 4),
-                    "position_size_usd": self.trade_size_usd,
-                    "confidence": 65,
-                    "timeframe": "10-20min",
-                    "reason": f"Pullback scalping: {pair} rose {change_1h:.2f}%, expecting retracement",
-                    "urgency": "high"
-                }
-        
-        # Random scalping in high volatility - both directions
-        import random
-        if volatility > 0.8 and random.random() > 0.6:
-            direction = "LONG" if random.random() > 0.5 else "SHORT"
-            reason = f"Volatility scalping: {pair} has {volatility:.2f}% volatility"
-            
-            if direction == "LONG":
-                return {
-                    "action": "TRADE",
-                    "pair": pair,
-                    "direction": direction,
-                    "entry_price": price,
-                    "stop_loss": round(price * (1 - self.scalp_stop_loss), 4),
-                    "take_profit": round(price * (1 + self.scalp_take_profit), 4),
-                    "position_size_usd": self.trade_size_usd,
-                    "confidence": 60,
-                    "timeframe": "5-15min",
-                    "reason": reason,
-                    "urgency": "medium"
-                }
-            else:
-                return {
-                    "action": "TRADE",
-                    "pair": pair,
-                    "direction": direction,
-                    "entry_price": price,
-                    "stop_loss": round(price * (1 + self.scalp_stop_loss), 4),
-                    "take_profit": round(price * (1 - self.scalp_take_profit), 4),
-                    "position_size_usd": self.trade_size_usd,
-                    "confidence": 60,
-                    "timeframe": "5-15min",
-                    "reason": reason,
-                    "urgency": "medium"
-                }
+        # Mean-reversion score: fade the last hour's move, but only in an active market
+        active = abs(change_1h) > self.fallback_min_move or volatility > self.fallback_min_volatility
+        score = -change_1h * active
+        direction = (
+            "LONG" if score > self.fallback_entry_score else
+            "SHORT" if score < -self.fallback_entry_score else
+            None
+        )
+        
+        if direction is None:
+            return self._FALLBACK_SKIP
         
+        sign = self._DIRECTION_SIGN[direction]
+        reason = (
+            f"Quick bounce scalping: {pair} dipped {change_1h:.2f}%" if direction == "LONG" else
+            f"Pullback scalping: {pair} rose {change_1h:.2f}%, expecting retracement"
+        )
         return {
-            "action": "SKIP", 
-            "confidence": 40,
-            "reason": f"Low volatility/opportunity for scalping"
+            "action": "TRADE",
+            "pair": pair,
+            "direction": direction,
+            "entry_price": price,
+            "stop_loss": round(price * (1 - sign * self.scalp_stop_loss), 4),
+            "take_profit": round(price * (1 + sign * self.scalp_take_profit), 4),
+            "position_size_usd": self.trade_size_usd,
+            "confidence": 65,
+            "timeframe": "10-20min",
+            "reason": reason,
+            "urgency": "high"
         }
-
+    
     def execute_scalping_trade(self, decision):
         """COMPLETELY FIXED version with proper TP/SL validation"""
+        reserved = False
         try:
             pair = decision["pair"]
             direction = decision["direction"]
             
-            print(f"🎯 TRADE DIRECTION: {direction}")
+            log.info("🎯 TRADE DIRECTION: %s", direction)
             
-            # Check if we can open new trade
-            if len(self.active_trades) >= self.max_concurrent_trades:
-                print(f"⚠️ Maximum trades reached ({self.max_concurrent_trades}), skipping {pair}")
-                return
+            # Check and reserve in one locked step - executions run concurrently,
+            # so a bare check-then-act could open two positions into one slot / pair
+            with self._trades_lock:
+                # Check if we can open new trade
+                if len(self.active_trades) + len(self._pending_entries) >= self.max_concurrent_trades:
+                    log.warning("⚠️ Maximum trades reached (%s), skipping %s", self.max_concurrent_trades, pair)
+                    return
+                
+                # Check if this pair already has active trade
+                if pair in self.active_trades or pair in self._pending_entries:
+                    log.warning("⚠️ Already have active trade for %s, skipping", pair)
+                    return
+                
+                self._pending_entries.add(pair)
+                reserved = True
             
-            # Check if this pair already has active trade
-            if pair in self.active_trades:
-                print(f"⚠️ Already have active trade for {pair}, skipping")
-                return
+            # Executions run concurrently - each worker thread signs with its own client
+            client = self._thread_client()
             
             # Get REAL current price - with validation
-            ticker = self.binance.futures_symbol_ticker(symbol=pair)
+            ticker = client.futures_symbol_ticker(symbol=pair)
             current_price = float(ticker['price'])
-            print(f"🔍 Current {pair} price: ${current_price}")
+            log.debug("🔍 Current %s price: $%s", pair, current_price)
             
             # Validate price is reasonable
             if current_price <= 0.1:
-                print(f"❌ Invalid price for {pair}: ${current_price}, skipping trade")
+                log.error("❌ Invalid price for %s: $%s, skipping trade", pair, current_price)
                 return
             
             # Calculate quantity with proper precision
             quantity = self.get_quantity(pair, current_price)
+            if quantity is None:
+                return
             
-            print(f"⚡ EXECUTING {direction}: {quantity} {pair} @ ${current_price}")
+            log.info("⚡ EXECUTING %s: %s %s @ $%s", direction, quantity, pair, current_price)
             
             # Use current price as safe entry price (fallback)
             safe_entry_price = current_price
             
             # MARKET ENTRY
             try:
-                if direction == "LONG":
-                    order = self.binance.futures_create_order(
-                        symbol=pair,
-                        side='BUY',
-                        type='MARKET',
-                        quantity=quantity
-                    )
-                    # Try to get actual entry price, fallback to safe price
-                    actual_entry = float(order.get('avgPrice', 0))
-                    if actual_entry <= 0.1:
-                        actual_entry = safe_entry_price
-                    print(f"✅ LONG ENTRY: ${actual_entry}")
-                else:  # SHORT
-                    order = self.binance.futures_create_order(
-                        symbol=pair,
-                        side='SELL',
-                        type='MARKET',
-                        quantity=quantity
-                    )
-                    # Try to get actual entry price, fallback to safe price
-                    actual_entry = float(order.get('avgPrice', 0))
-                    if actual_entry <= 0.1:
-                        actual_entry = safe_entry_price
-                    print(f"✅ SHORT ENTRY: ${actual_entry}")
+                self._order_bucket.acquire()
+                sent_ns = time.perf_counter_ns()
+                order = client.futures_create_order(
+                    symbol=pair,
+                    side=self._ENTRY_SIDE[direction],
+                    type='MARKET',
+                    quantity=quantity,
+                    newOrderRespType='RESULT'  # reply after the fill - carries avgPrice, no wait/poll for the position
+                )
+                fill_ms = (time.perf_counter_ns() - sent_ns) / 1e6
+                # Actual fill price from the RESULT response, fallback to safe price
+                actual_entry = float(order.get('avgPrice', 0))
+                if actual_entry <= 0.1:
+                    actual_entry = safe_entry_price
+                log.info("✅ %s ENTRY: $%s (filled in %.0f ms)", direction, actual_entry, fill_ms)
             except Exception as order_error:
-                print(f"❌ Entry order failed: {order_error}")
+                log.error("❌ Entry order failed: %s", order_error)
                 return
             
             # Use the validated entry price
             entry_price = actual_entry
             
-            # Calculate TP/SL with PROPER validation
-            if direction == "LONG":
-                stop_loss = entry_price * (1 - self.scalp_stop_loss)
-                take_profit = entry_price * (1 + self.scalp_take_profit)
-                print(f"🎯 LONG: Entry=${entry_price}, TP=${take_profit:.4f} (+{self.scalp_take_profit*100}%), SL=${stop_loss:.4f} (-{self.scalp_stop_loss*100}%)")
-            else:  # SHORT
-                stop_loss = entry_price * (1 + self.scalp_stop_loss)      # SL above entry
-                take_profit = entry_price * (1 - self.scalp_take_profit)  # TP below entry
-                print(f"🎯 SHORT: Entry=${entry_price}, TP=${take_profit:.4f} (-{self.scalp_take_profit*100}%), SL=${stop_loss:.4f} (+{self.scalp_stop_loss*100}%)")
-            
-            # Format prices according to symbol precision
+            # TP/SL - side validity holds by construction, no re-check/recalculate pass needed
+            take_profit, stop_loss = compute_tp_sl(
+                entry_price, self._DIRECTION_SIGN[direction], self.scalp_take_profit, self.scalp_stop_loss,
+                self.tick_size.get(pair, 0.0)
+            )
             stop_loss = self.format_price(pair, stop_loss)
             take_profit = self.format_price(pair, take_profit)
-            
-            # CRITICAL: Validate TP/SL are on correct sides of entry
-            if direction == "LONG":
-                if take_profit <= entry_price:
-                    print(f"❌ INVALID LONG TP: TP${take_profit} <= Entry${entry_price}")
-                    take_profit = entry_price * (1 + self.scalp_take_profit)  # Recalculate
-                    take_profit = self.format_price(pair, take_profit)
-                if stop_loss >= entry_price:
-                    print(f"❌ INVALID LONG SL: SL${stop_loss} >= Entry${entry_price}")
-                    stop_loss = entry_price * (1 - self.scalp_stop_loss)  # Recalculate
-                    stop_loss = self.format_price(pair, stop_loss)
-            else:  # SHORT
-                if take_profit >= entry_price:
-                    print(f"❌ INVALID SHORT TP: TP${take_profit} >= Entry${entry_price}")
-                    take_profit = entry_price * (1 - self.scalp_take_profit)  # Recalculate
-                    take_profit = self.format_price(pair, take_profit)
-                if stop_loss <= entry_price:
-                    print(f"❌ INVALID SHORT SL: SL${stop_loss} <= Entry${entry_price}")
-                    stop_loss = entry_price * (1 + self.scalp_stop_loss)  # Recalculate
-                    stop_loss = self.format_price(pair, stop_loss)
+            log.info("🎯 %s: Entry=$%s, TP=$%s (%s%%), SL=$%s (%s%%)", direction, entry_price, take_profit, self.scalp_take_profit*100, stop_loss, self.scalp_stop_loss*100)
             
             # Final validation of prices
             if stop_loss <= 0.01 or take_profit <= 0.01:
-                print(f"❌ Invalid TP/SL prices: TP=${take_profit}, SL=${stop_loss}")
+                log.error("❌ Invalid TP/SL prices: TP=$%s, SL=$%s", take_profit, stop_loss)
                 return
             
-            print(f"✅ VALIDATED: TP=${take_profit}, SL=${stop_loss}")
+            log.info("✅ VALIDATED: TP=$%s, SL=$%s", take_profit, stop_loss)
+            
+            # Place TP/SL together in one signed batch request (values string-coerced for batchOrders)
+            exit_side = self._EXIT_SIDE[direction]
+            qty_str = str(quantity)  # already rounded to the lot precision by get_quantity
+            price_decimals = self.price_precision.get(pair, 4)
+            # Deterministic client ids: a retried batch can't double the legs, and a restart can find them again
+            entry_time = time.time()
+            order_tag = f"{pair}-{int(entry_time)}"
+            protective_orders = [
+                {'symbol': pair, 'side': exit_side, 'type': 'STOP_MARKET', 'timeInForce': 'GTC', 'reduceOnly': 'true',
+                 'quantity': qty_str, 'stopPrice': f"{stop_loss:.{price_decimals}f}",
+                 'newClientOrderId': f"{self._ORDER_TAG}-SL-{order_tag}"},
+                {'symbol': pair, 'side': exit_side, 'type': 'TAKE_PROFIT_MARKET', 'timeInForce': 'GTC', 'reduceOnly': 'true',
+                 'quantity': qty_str, 'stopPrice': f"{take_profit:.{price_decimals}f}",
+                 'newClientOrderId': f"{self._ORDER_TAG}-TP-{order_tag}"},
+            ]
+            
+            # Store trade info BEFORE the TP/SL go live - a leg can fill and be pushed
+            # over the user-data stream before the batch request even returns
+            with self._trades_lock:
+                self.active_trades[pair] = ActiveTrade(
+                    pair=pair,
+                    direction=direction,
+                    entry_price=entry_price,
+                    quantity=quantity,
+                    stop_loss=stop_loss,
+                    take_profit=take_profit,
+                    entry_time=entry_time,
+                    confidence=decision["confidence"],
+                    exit_order_ids=tuple(order['newClientOrderId'] for order in protective_orders)
+                )
             
-            # Place TP/SL orders with proper price formatting
             try:
-                if direction == "LONG":
-                    # STOP LOSS
-                    self.binance.futures_create_order(
-                        symbol=pair,
-                        side='SELL',
-                        type='STOP_MARKET',
-                        quantity=quantity,
-                        stopPrice=stop_loss,
-                        timeInForce='GTC',
-                        reduceOnly=True
-                    )
-                    # TAKE PROFIT
-                    self.binance.futures_create_order(
-                        symbol=pair,
-                        side='SELL',
-                        type='LIMIT',
-                        quantity=quantity,
-                        price=take_profit,
-                        timeInForce='GTC',
-                        reduceOnly=True
-                    )
-                else:  # SHORT
-                    # STOP LOSS
-                    self.binance.futures_create_order(
-                        symbol=pair,
-                        side='BUY',
-                        type='STOP_MARKET',
-                        quantity=quantity,
-                        stopPrice=stop_loss,
-                        timeInForce='GTC',
-                        reduceOnly=True
-                    )
-                    # TAKE PROFIT
-                    self.binance.futures_create_order(
-                        symbol=pair,
-                        side='BUY',
-                        type='LIMIT',
-                        quantity=quantity,
-                        price=take_profit,
-                        timeInForce='GTC',
-                        reduceOnly=True
-                    )
+                self.place_protective_orders_with_retry(protective_orders)
             except Exception as sl_tp_error:
-                print(f"❌ TP/SL order failed: {sl_tp_error}")
-                # Try to close the position if TP/SL fails
-                try:
-                    if direction == "LONG":
-                        self.binance.futures_create_order(
-                            symbol=pair,
-                            side='SELL',
-                            type='MARKET',
-                            quantity=quantity,
-                            reduceOnly=True
-                        )
-                    else:
-                        self.binance.futures_create_order(
+                # Only an explicit rejection (-2010/-2011/-4003, other 4xx, a refused leg) closes the position.
+                # After 5xx / rate limit / clock errors the legs may well be live - look before closing anything
+                rejected = isinstance(sl_tp_error, RuntimeError) or (
+                    isinstance(sl_tp_error, BinanceAPIException) and not is_transient_error(sl_tp_error))
+                if rejected:
+                    # Exchange rejected the TP/SL - close rather than sit unprotected
+                    log.error("❌ TP/SL order rejected: %s", sl_tp_error)
+                    with self._trades_lock:
+                        self.active_trades.pop(pair, None)  # not a completed trade - don't let the stream report it
+                    try:
+                        self._order_bucket.acquire()
+                        client.futures_create_order(
                             symbol=pair,
-                            side='BUY',
+                            side=exit_side,
                             type='MARKET',
                             quantity=quantity,
                             reduceOnly=True
                         )
-                    print(f"⚠️ Position closed due to TP/SL error")
-                except:
-                    print(f"❌ Failed to close position")
-                return
-            
-            # Store trade info
-            self.active_trades[pair] = {
-                "pair": pair,
-                "direction": direction,
-                "entry_price": entry_price,
-                "quantity": quantity,
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "entry_time": time.time(),
-                "confidence": decision["confidence"]
-            }
+                        log.warning("⚠️ Position closed due to TP/SL error")
+                        # Drop whichever protective leg did get accepted - by id, so manual orders survive
+                        self._cancel_exit_orders(pair, [order['newClientOrderId'] for order in protective_orders])
+                    except Exception as close_error:
+                        log.error("❌ Failed to close position: %s", close_error)
+                    return
+                
+                if not self._exit_legs_live(pair, [order['newClientOrderId'] for order in protective_orders]):
+                    log.error("🚨 TP/SL status unknown for %s after retries: %s - CHECK POSITION MANUALLY",
+                              pair, sl_tp_error)
+                    # Still tracked so the stream / position check can complete it - but not reported as protected
+                    log.warning("⚠️ %s %s trade OPEN, protection UNKNOWN", pair, direction)
+                    return
+                log.info("✅ TP/SL for %s confirmed on the exchange despite: %s", pair, sl_tp_error)
             
-            print(f"🚀 {direction} TRADE ACTIVATED!")
-            print(f"   Active Trades: {list(self.active_trades.keys())}")
+            log.info("🚀 %s TRADE ACTIVATED!", direction)
+            with self._trades_lock:
+                active = list(self.active_trades)
+            log.info("   Active Trades: %s", active)
             
         except Exception as e:
-            print(f"❌ {direction} trade execution failed: {e}")
-            import traceback
-            traceback.print_exc()
+            log.error("❌ %s trade execution failed: %s", direction, e, exc_info=True)
+            self._note_api_error(e)
+        finally:
+            if reserved:
+                with self._trades_lock:
+                    self._pending_entries.discard(pair)
+
+    def place_protective_orders_with_retry(self, orders, retries=2):
+        """place_protective_orders, retrying network errors, 5xx, rate limits and clock skew with a short backoff"""
+        for attempt in range(retries + 1):
+            try:
+                return self.place_protective_orders(orders)
+            except (requests.exceptions.RequestException, BinanceAPIException) as e:
+                if not is_transient_error(e) or attempt == retries:
+                    raise
+                log.warning("⚠️ TP/SL transient error (%s), retry %s/%s", e, attempt + 1, retries)
+                if isinstance(e, BinanceAPIException) and e.code == -1021:
+                    warm_binance_client(self._thread_client())  # timestamp outside recvWindow - resync the clock
+                time.sleep(0.1 * 2 ** attempt)
+    
+    def _exit_legs_live(self, pair, client_order_ids):
+        """True if every protective leg is open on the exchange - checked after an ambiguous placement error"""
+        try:
+            open_orders = self._thread_client().futures_get_open_orders(symbol=pair)
+        except Exception as e:
+            log.warning("⚠️ Could not look up TP/SL orders for %s: %s", pair, e)
+            self._note_api_error(e)
+            return False
+        return set(client_order_ids) <= {order.get('clientOrderId') for order in open_orders}
+
+    def place_protective_orders(self, orders):
+        """Submit SL + TP in one batchOrders call; pipeline them concurrently if the batch is refused"""
+        try:
+            self._order_bucket.acquire(len(orders))
+            results = self._thread_client().futures_place_batch_order(batchOrders=orders)
+        except BinanceAPIException as e:
+            if e.code not in self._BATCH_FALLBACK_CODES:
+                raise
+            # Some accounts reject STOP_MARKET through batchOrders - send both legs in parallel instead
+            log.warning("⚠️ Batch TP/SL rejected (%s), sending orders concurrently", e.message)
+            return list(self._market_pool.map(self._create_order_on_worker, orders))
+        
+        # batchOrders answers per order - failed legs come back as {"code": ..., "msg": ...}
+        rejected = [(i, r) for i, r in enumerate(results) if 'code' in r and r['code'] != self._DUPLICATE_ORDER_ID]
+        fatal = [r for _, r in rejected if r['code'] not in self._BATCH_FALLBACK_CODES]
+        if fatal:
+            raise RuntimeError(f"batch order legs rejected: {fatal}")
+        if rejected:
+            # Only the legs the batch endpoint refused go out again, one order each
+            log.warning("⚠️ %s TP/SL leg(s) refused by batchOrders, sending them individually", len(rejected))
+            resent = self._market_pool.map(self._create_order_on_worker, [orders[i] for i, _ in rejected])
+            for (i, _), result in zip(rejected, resent):
+                results[i] = result
+        return results
+    
+    def _create_order_on_worker(self, params):
+        """futures_create_order on the calling worker thread's own client"""
+        self._order_bucket.acquire()
+        return self._thread_client().futures_create_order(**params)
 
     def check_scalping_trades(self):
         """Check all active trades status"""
         if not self.active_trades:
             return
         
-        completed_trades = []
+        # One request for every position instead of one per active pair
+        try:
+            all_positions = self.binance.futures_position_information()
+        except Exception as e:
+            log.error("❌ Trade check error: %s", e)
+            self._note_api_error(e)
+            return
+        
+        # (symbol, LONG/SHORT) of every open position - hedge mode reports each side as its own row.
+        # "0.000" -> "" after stripping, so zero rows are dropped without a float() parse each
+        open_positions = set()
+        for p in all_positions:
+            amount = p['positionAmt']
+            if not amount.lstrip('-0.'):
+                continue
+            side = p.get('positionSide', 'BOTH')
+            if side == 'BOTH':  # one-way mode - the sign is the side
+                side = 'SHORT' if amount.startswith('-') else 'LONG'
+            open_positions.add((p['symbol'], side))
+        
+        with self._trades_lock:
+            completed_trades = [
+                pair for pair, trade in self.active_trades.items() if (pair, trade.direction) not in open_positions
+            ]
+            for pair in completed_trades:
+                self._complete_trade(pair)
+
+    def _complete_trade(self, pair, filled_id=None):
+        """Log and drop a finished trade (caller must hold _trades_lock)"""
+        trade_info = self.active_trades.pop(pair, None)
+        if trade_info is None:
+            return
+        
+        trade_duration = (time.monotonic() - trade_info.entry_mono) / 60
+        
+        log.info("💰 TRADE COMPLETED: %s!", pair)
+        log.info("   Direction: %s", trade_info.direction)
+        log.info("   Duration: %.1f minutes", trade_duration)
+        log.info("   Confidence: %s%%", trade_info.confidence)
+        log.info("📊 Remaining Active Trades: %s", list(self.active_trades.keys()))
         
-        for pair, trade_info in self.active_trades.items():
+        # OCO by hand: the other reduce-only leg is still resting and would hit the pair's next position.
+        # Off this thread - callers hold the lock and may be the websocket callback
+        leftover = [order_id for order_id in trade_info.exit_order_ids if order_id != filled_id]
+        if leftover:
+            self._market_pool.submit(self._cancel_exit_orders, pair, leftover)
+    
+    def _cancel_exit_orders(self, pair, client_order_ids):
+        """Cancel our TP/SL legs by clientOrderId - the user's own orders on the symbol are left alone"""
+        client = self._thread_client()
+        for order_id in client_order_ids:
             try:
-                # Check if position still exists
-                positions = self.binance.futures_position_information(symbol=pair)
-                position = next((p for p in positions if float(p['positionAmt']) != 0), None)
-                
-                if not position:
-                    # Trade completed
-                    exit_time = time.time()
-                    trade_duration = (exit_time - trade_info["entry_time"]) / 60
-                    
-                    print(f"💰 TRADE COMPLETED: {pair}!")
-                    print(f"   Direction: {trade_info['direction']}")
-                    print(f"   Duration: {trade_duration:.1f} minutes")
-                    print(f"   Confidence: {trade_info['confidence']}%")
-                    
-                    completed_trades.append(pair)
-                    
+                self._order_bucket.acquire()
+                client.futures_cancel_order(symbol=pair, origClientOrderId=order_id)
+                log.debug("🧹 Cancelled leftover exit order %s", order_id)
+            except BinanceAPIException as e:
+                if e.code != -2011:  # -2011 unknown order: already filled / cancelled, nothing left to do
+                    log.error("❌ Leftover exit order cancel failed for %s: %s", order_id, e)
             except Exception as e:
-                print(f"❌ Trade check error for {pair}: {e}")
+                log.error("❌ Leftover exit order cancel failed for %s: %s", order_id, e)
+
+    def _ensure_twm(self):
+        """Start the shared websocket manager on first use"""
+        if self._twm is None:
+            self._twm = ThreadedWebsocketManager(self.binance_api_key, self.binance_secret)
+            self._twm.start()
+        return self._twm
+
+    def sync_market_streams(self):
+        """(Re)subscribe the 15m kline multiplex stream whenever the pair list changes"""
+        pairs = frozenset(self.available_pairs)
+        if pairs == self._market_stream_pairs:
+            return
         
-        # Remove completed trades
-        for pair in completed_trades:
-            del self.active_trades[pair]
+        try:
+            twm = self._ensure_twm()
+            if self._market_socket:
+                twm.stop_socket(self._market_socket)
+                self._market_socket = None
+            
+            # The stream only delivers candles from now on - seed history once from REST
+            new_pairs = [pair for pair in pairs if pair not in self._kline_buffers]
+            seeded = dict(self._market_pool.map(self._seed_klines, new_pairs))
+            with self._kline_lock:
+                for pair in list(self._kline_buffers):
+                    if pair not in pairs:  # rotated out
+                        del self._kline_buffers[pair]
+                        self._last_price.pop(pair, None)
+                        self._stream_updated.pop(pair, None)
+                for pair, buffer in seeded.items():
+                    if buffer is not None:
+                        self._kline_buffers[pair] = buffer
+            
+            streams = [f"{pair.lower()}@kline_15m" for pair in sorted(pairs)]
+            self._market_socket = twm.start_futures_multiplex_socket(
+                callback=self._handle_market_event, streams=streams
+            )
+            self._market_stream_pairs = pairs
+            log.info("📡 Kline stream subscribed for %s pairs", len(pairs))
+        except Exception as e:
+            log.error("❌ Kline stream subscribe error (using REST): %s", e)
+            self._note_api_error(e)
+
+    def _seed_klines(self, pair):
+        """Last 20 x 15m candles as a preallocated stream buffer (disk cache + REST delta) -> (pair, ndarray|None)"""
+        try:
+            cached = self._load_cached_klines(pair)
+            if cached is not None and time.time() * 1000 - cached[-1, 0] < KLINE_INTERVAL_MS:
+                # Saved window still ends in the current candle - the stream refreshes it on the next push
+                return pair, cached
+            
+            # Allocated once per subscription; stream updates are written into it in place
+            window = self._fetch_kline_window(pair, cached)
+            if window is not None:
+                self._save_cached_klines(pair, window)
+            return pair, window
+        except Exception as e:
+            log.error("❌ Kline seed error for %s: %s", pair, e)
+            self._note_api_error(e)
+            return pair, None
+    
+    def _fetch_kline_window(self, pair, cached=None):
+        """Latest 15m window from REST - only the candles after `cached` when it is recent enough"""
+        now_ms = time.time() * 1000
+        params = {'symbol': pair, 'interval': Client.KLINE_INTERVAL_15MINUTE, 'limit': KLINE_WINDOW}
+        # A gap wider than the window can't be filled by a delta - fetch it whole
+        if cached is not None and now_ms - cached[-1, 0] < (KLINE_WINDOW - 1) * KLINE_INTERVAL_MS:
+            params['startTime'] = int(cached[-1, 0])
+        else:
+            cached = None
+        klines = self._thread_client().futures_klines(**params)
+        if not klines:
+            return cached
         
-        if completed_trades:
-            print(f"📊 Remaining Active Trades: {list(self.active_trades.keys())}")
+        fresh = np.array([k[:6] for k in klines], dtype=np.float64)
+        if cached is not None:
+            # The cached last candle was still forming - the fetched copy replaces it
+            fresh = np.concatenate((cached[cached[:, 0] < fresh[0, 0]], fresh))[-KLINE_WINDOW:]
+        return np.ascontiguousarray(fresh)
+    
+    def _kline_cache_path(self, pair):
+        return os.path.join(self.kline_cache_dir, f"{pair}_15m.npy")
+    
+    def _load_cached_klines(self, pair):
+        """Saved 15m window for the pair, or None if missing/unreadable"""
+        try:
+            klines = np.load(self._kline_cache_path(pair))
+        except (OSError, ValueError):
+            return None
+        if klines.ndim != 2 or klines.shape[1] != 6 or not len(klines):
+            return None
+        return klines
+    
+    def _save_cached_klines(self, pair, klines):
+        """Write the window atomically - a crash mid-write never leaves a torn cache file"""
+        tmp_path = None
+        try:
+            os.makedirs(self.kline_cache_dir, exist_ok=True)
+            # Unique temp file per write - the stream thread and REST workers can save the same pair at once
+            with tempfile.NamedTemporaryFile(dir=self.kline_cache_dir, prefix=f"{pair}_", suffix=".tmp",
+                                             delete=False) as tmp:
+                tmp_path = tmp.name
+                np.save(tmp, klines)
+            os.replace(tmp_path, self._kline_cache_path(pair))
+        except OSError as e:
+            log.warning("⚠️ Kline cache write failed for %s: %s", pair, e)
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _handle_market_event(self, msg):
+        """Fold a pushed kline update into the pair's rolling candle buffer"""
+        try:
+            data = msg.get('data', msg)
+            
+            if data.get('e') == 'error':
+                # Resubscribe + reseed on the next cycle; REST covers the gap meanwhile
+                log.warning("⚠️ Kline stream error: %s", data.get('m', data))
+                with self._kline_lock:
+                    self._kline_buffers.clear()
+                    self._stream_updated.clear()
+                self._market_stream_pairs = frozenset()
+                return
+            
+            if data.get('e') != 'kline':
+                return
+            
+            k = data['k']
+            pair = data['s']
+            row = (k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']))
+            
+            with self._kline_lock:
+                buffer = self._kline_buffers.get(pair)
+                if buffer is None:
+                    return
+                if buffer[-1, 0] == row[0]:
+                    buffer[-1] = row  # same candle still forming
+                elif row[0] > buffer[-1, 0]:
+                    buffer[:-1] = buffer[1:]  # new candle opened - shift the window left in place
+                    buffer[-1] = row
+                self._last_price[pair] = row[4]
+                self._stream_updated[pair] = time.monotonic()
+                closed_window = buffer.copy() if k.get('x') else None
+            
+            if closed_window is not None:
+                self._save_cached_klines(pair, closed_window)  # a closed candle is final - persist the window
+            
+            # Wake once per cycle per pair - the reference is dropped until the next cycle sets it again
+            ref_price = self._cycle_prices.get(pair)
+            if k.get('x') or (ref_price and abs(row[4] - ref_price) > ref_price * self.wake_price_move):
+                self._cycle_prices.pop(pair, None)
+                self._market_wake.set()
+        except Exception as e:
+            log.error("❌ Kline stream event error: %s", e)
+
+    def start_user_stream(self):
+        """Subscribe to the futures user-data stream so TP/SL fills are pushed to us"""
+        try:
+            twm = self._ensure_twm()
+            if self._user_socket:
+                twm.stop_socket(self._user_socket)  # reconnect - drop the dead socket first
+            
+            # Listen key create + 30 min keepalive ကို manager ကကိုယ်တိုင်လုပ်ပေးတယ်
+            self._user_socket = twm.start_futures_user_socket(callback=self._handle_user_event)
+            self._user_stream_active = True
+            log.info("📡 User data stream connected - trade exits are now event driven")
+        except Exception as e:
+            self._user_stream_active = False
+            log.error("❌ User data stream failed, falling back to polling: %s", e)
+
+    def _handle_user_event(self, msg):
+        """Handle ORDER_TRADE_UPDATE / ACCOUNT_UPDATE pushes from the user-data stream"""
+        try:
+            msg = msg.get('data', msg)
+            event = msg.get('e')
+            
+            if event == 'error':
+                # Socket dropped - let the main loop poll positions again until restarted
+                self._user_stream_active = False
+                log.warning("⚠️ User data stream error: %s", msg.get('m', msg))
+                return
+            
+            if event == 'ORDER_TRADE_UPDATE':
+                order = msg['o']
+                # Reduce-only fill of one of our legs = TP/SL hit (a manual reduce-only order isn't)
+                if order.get('X') == 'FILLED' and order.get('R'):
+                    with self._trades_lock:
+                        trade = self.active_trades.get(order['s'])
+                        if trade is not None and order.get('c') in trade.exit_order_ids:
+                            self._complete_trade(order['s'], filled_id=order['c'])
+            
+            elif event == 'ACCOUNT_UPDATE':
+                # Position went flat by any other route (manual close, liquidation) -
+                # (symbol, LONG/SHORT) like check_scalping_trades, so a flat hedge leg can't end the other side
+                flat = set()
+                for p in msg['a'].get('P', []):
+                    amount = float(p['pa'])
+                    side = p.get('ps', 'BOTH')
+                    if side != 'BOTH':
+                        if amount == 0:
+                            flat.add((p['s'], side))
+                    elif amount == 0:  # one-way mode - nothing left on either side
+                        flat.update(((p['s'], 'LONG'), (p['s'], 'SHORT')))
+                    else:  # one-way mode flipped - the opposite side is gone
+                        flat.add((p['s'], 'LONG' if amount < 0 else 'SHORT'))
+                if flat:
+                    with self._trades_lock:
+                        done = [pair for pair, trade in self.active_trades.items() if (pair, trade.direction) in flat]
+                        for pair in done:
+                            self._complete_trade(pair)
+        except Exception as e:
+            log.error("❌ User stream event error: %s", e)
 
     def run_scalping_cycle(self):
         """Single scalping cycle for multiple pairs"""
@@ -878,92 +1721,151 @@ class MultiPairScalpingTrader:
             market_data = self.get_detailed_market_data()
             
             if not market_data:
-                print("⚠️ No market data available, skipping cycle...")
+                log.warning("⚠️ No market data available, skipping cycle...")
                 return
             
+            # Snapshot under the lock - the user-stream thread completes trades while the cycle runs
+            with self._trades_lock:
+                active = list(self.active_trades)
+            
             # Display current status
-            print(f"\n📊 CURRENT STATUS:")
-            print(f"   Available Pairs: {len(self.available_pairs)}")
-            print(f"   Active Trades: {len(self.active_trades)}/{self.max_concurrent_trades}")
-            if self.active_trades:
-                print(f"   Trading Pairs: {list(self.active_trades.keys())}")
+            log.info("\n📊 CURRENT STATUS:")
+            log.info("   Available Pairs: %s", len(self.available_pairs))
+            log.info("   Active Trades: %s/%s", len(active), self.max_concurrent_trades)
+            if active:
+                log.info("   Trading Pairs: %s", active)
             
-            # Get AI decision for each available pair
+            # Get AI decisions for all candidate pairs in one batched request
             trade_opportunities = []
+            # market_data only holds available pairs - set difference drops pairs with active trades
+            candidates = list(market_data.keys() - set(active))
+            decisions = self.get_scalping_decision({pair: market_data[pair] for pair in candidates}) if candidates else {}
             
-            for pair in self.available_pairs:
-                if pair in self.active_trades:
-                    continue  # Skip pairs with active trades
-                    
-                if pair in market_data:
-                    pair_data = {pair: market_data[pair]}
-                    decision = self.get_scalping_decision(pair_data)
-                    
-                    if decision["action"] == "TRADE" and decision["confidence"] >= 65:
+            now = time.monotonic()
+            for pair, decision in decisions.items():
+                if decision["action"] == "TRADE":
+                    self._skip_until.pop(pair, None)
+                    if decision["confidence"] >= 65:
                         trade_opportunities.append((decision, decision["confidence"]))
+                else:
+                    # HOLD - a quiet pair rarely changes within a couple of cycles
+                    self._skip_until[pair] = now + self.skip_seconds
             
             # Sort by confidence and execute top opportunities
             trade_opportunities.sort(key=lambda x: x[1], reverse=True)
             
+            # Fill the free trade slots, then open those trades concurrently (order rate throttled by _order_bucket)
+            with self._trades_lock:
+                free_slots = max(0, self.max_concurrent_trades - len(self.active_trades))
+            selected = []
             for decision, confidence in trade_opportunities:
-                if len(self.active_trades) >= self.max_concurrent_trades:
+                if len(selected) >= free_slots:
                     break
                     
                 urgency = decision.get("urgency", "medium")
                 if urgency == "high" or (urgency == "medium" and confidence >= 70):
-                    print(f"🎯 EXECUTING SCALPING: {decision['pair']} {decision['direction']}")
-                    self.execute_scalping_trade(decision)
-                    time.sleep(2)  # Small delay between executions
+                    log.info("🎯 EXECUTING SCALPING: %s %s", decision['pair'], decision['direction'])
+                    selected.append(decision)
             
-            # Check all active trades
-            self.check_scalping_trades()
+            list(self._execution_pool.map(self.execute_scalping_trade, selected))
+            
+            # Exits arrive via the user-data stream; only poll if it is down
+            if not self._user_stream_active:
+                self.check_scalping_trades()
             
         except Exception as e:
-            print(f"❌ Scalping cycle error: {e}")
+            if is_transient_error(e):
+                raise  # rate limits (418/429/-1003), 5xx and network failures go up to the main loop's backoff
+            log.error("❌ Scalping cycle error: %s", e)
 
     def start_auto_trading(self):
         """Main auto trading loop"""
-        print("🚀 STARTING MULTI-PAIR SCALPING BOT (NO BTC)!")
+        log.info("🚀 STARTING MULTI-PAIR SCALPING BOT (NO BTC)!")
         
         # Initial pair selection
         self.available_pairs = self.get_ai_recommended_pairs()
         self.last_rotation_time = time.time()
         
+        # Event-driven trade exit detection
+        self.start_user_stream()
+        
         cycle_count = 0
+        cycle_seconds = 60
+        error_streak = 0  # consecutive main loop errors - drives the backoff
+        base = time.monotonic()  # cycles are scheduled from here, so they don't drift
         
-        while True:
-            try:
-                cycle_count += 1
-                print(f"\n{'='*60}")
-                print(f"🔄 CYCLE {cycle_count} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"{'='*60}")
-                
-                # Run scalping cycle
-                self.run_scalping_cycle()
-                
-                # Status update every 10 cycles
-                if cycle_count % 10 == 0:
-                    print(f"\n📈 BOT STATUS UPDATE:")
-                    print(f"   Total Cycles: {cycle_count}")
-                    print(f"   Available Pairs: {len(self.available_pairs)}")
-                    print(f"   Active Trades: {len(self.active_trades)}/{self.max_concurrent_trades}")
-                    print(f"   Next Rotation: {time.strftime('%H:%M:%S', time.localtime(self.last_rotation_time + self.pair_rotation_hours * 3600))}")
-                
-                time.sleep(60)  # 1 minute between cycles
+        try:
+            while True:
+                try:
+                    cycle_count += 1
+                    log.info("\n%s", '='*60)
+                    log.info("🔄 CYCLE %s - %s", cycle_count, time.strftime('%Y-%m-%d %H:%M:%S'))
+                    log.info("%s", '='*60)
+                    
+                    # Run scalping cycle - clear the wake-up first, so a candle close / sharp move that
+                    # arrives while it runs still cuts the next sleep short instead of being dropped
+                    self._market_wake.clear()
+                    self._api_error = None
+                    self.run_scalping_cycle()
+                    if self._api_error is not None:
+                        # A helper logged and swallowed a rate limit / outage - back off instead of
+                        # hitting the API again on schedule (and on every wake-up)
+                        raise self._api_error
+                    
+                    # Status update every 10 cycles
+                    if cycle_count % 10 == 0:
+                        log.info("\n📈 BOT STATUS UPDATE:")
+                        log.info("   Total Cycles: %s", cycle_count)
+                        log.info("   Available Pairs: %s", len(self.available_pairs))
+                        with self._trades_lock:
+                            active_count = len(self.active_trades)
+                        log.info("   Active Trades: %s/%s", active_count, self.max_concurrent_trades)
+                        log.info("   Next Rotation: %s", time.strftime('%H:%M:%S', time.localtime(self.last_rotation_time + self.pair_rotation_hours * 3600)))
+                    
+                    # Reconnect the user-data stream if it dropped
+                    if not self._user_stream_active:
+                        self.start_user_stream()
+                    
+                    # Sleep until this cycle's slot ends (1 minute after it *started*) -
+                    # or until the stream reports a candle close / sharp move, so it is acted on at once
+                    sleep_for = base + cycle_seconds * cycle_count - time.monotonic()
+                    if sleep_for > 0:
+                        if self._market_wake.wait(sleep_for):
+                            log.info("⚡ Market event, running the next cycle now")
+                            base = time.monotonic() - cycle_seconds * cycle_count  # next slot counts from here
+                    else:
+                        log.warning("⚠️ Cycle overran by %.2fs", -sleep_for)
+                        base = time.monotonic() - cycle_seconds * cycle_count  # re-anchor, no burst of catch-up cycles
+                    error_streak = 0
                 
-            except KeyboardInterrupt:
-                print(f"\n🛑 BOT STOPPED BY USER")
-                if self.active_trades:
-                    print(f"   Active Trades: {list(self.active_trades.keys())}")
-                break
-            except Exception as e:
-                print(f"❌ Main loop error: {e}")
-                time.sleep(30)
+                except Exception as e:
+                    # Transient errors (rate limit, DNS blip) usually clear in seconds - back off 1s, 2s, 4s ... 60s
+                    delay = min(60, 2 ** error_streak) + random.random() * 0.5
+                    error_streak += 1
+                    retry_after = getattr(getattr(e, 'response', None), 'headers', {}).get('Retry-After')
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, int(retry_after))  # the exchange told us how long the ban lasts
+                    log.error("❌ Main loop error: %s (retrying in %.1fs)", e, delay)
+                    time.sleep(delay)
+                    base = time.monotonic() - cycle_seconds * cycle_count  # the retry cycle starts now, not "overran"
+        except KeyboardInterrupt:
+            # Also reached from the backoff sleep, not just the cycle
+            log.info("\n🛑 BOT STOPPED BY USER")
+            with self._trades_lock:
+                active = list(self.active_trades)
+            if active:
+                log.info("   Active Trades: %s", active)
+        finally:
+            if self._twm:
+                self._twm.stop()
+            self._execution_pool.shutdown(wait=False, cancel_futures=True)
+            self._market_pool.shutdown(wait=False, cancel_futures=True)
 
 # 🚀 START MULTI-PAIR SCALPING BOT
 if __name__ == "__main__":
+    setup_logging()
     try:
         bot = MultiPairScalpingTrader()
         bot.start_auto_trading()
     except Exception as e:
-        print(f"❌ Failed to start bot: {e}")
+        log.error("❌ Failed to start bot: %s", e)
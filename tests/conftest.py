@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# bot.py is a single module at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance.exceptions import BinanceAPIException  # noqa: E402
+
+from bot import MultiPairScalpingTrader, TokenBucket  # noqa: E402
+
+
+def api_error(status_code, code, msg="error"):
+    """BinanceAPIException as python-binance raises it for an error response"""
+    return BinanceAPIException(None, status_code, json.dumps({"code": code, "msg": msg}))
+
+
+class FakeBinance:
+    """Binance client stand-in - records every futures_* call and answers from `responses`
+    (a value, an exception to raise, or a callable taking the call's params)"""
+
+    def __init__(self):
+        self.calls = []
+        self.responses = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("futures_"):
+            raise AttributeError(name)
+
+        def endpoint(**params):
+            self.calls.append((name, params))
+            response = self.responses.get(name)
+            if isinstance(response, Exception):
+                raise response
+            return response(**params) if callable(response) else response
+        return endpoint
+
+    def called(self, name):
+        return [params for call, params in self.calls if call == name]
+
+
+EXCHANGE_INFO = {"symbols": [
+    {"symbol": "ETHUSDT", "status": "TRADING", "quoteAsset": "USDT", "filters": [
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+        {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+        {"filterType": "MIN_NOTIONAL", "notional": "20"}]},
+    {"symbol": "AVAXUSDT", "status": "TRADING", "quoteAsset": "USDT", "filters": [
+        {"filterType": "LOT_SIZE", "stepSize": "1", "minQty": "1"},
+        {"filterType": "PRICE_FILTER", "tickSize": "0.001"},
+        {"filterType": "MIN_NOTIONAL", "notional": "20"}]},
+    {"symbol": "XRPUSDT", "status": "TRADING", "quoteAsset": "USDT", "filters": [
+        {"filterType": "LOT_SIZE", "stepSize": "0.1", "minQty": "0.1"},
+        {"filterType": "PRICE_FILTER", "tickSize": "0.0001"},
+        {"filterType": "MIN_NOTIONAL", "notional": "5"}]},
+]}
+
+
+@pytest.fixture
+def binance():
+    return FakeBinance()
+
+
+@pytest.fixture
+def trader(binance):
+    """MultiPairScalpingTrader on a fake client - no network, websockets or startup calls"""
+    trader = MultiPairScalpingTrader.__new__(MultiPairScalpingTrader)
+    trader.binance = binance
+    trader._thread_client = lambda: binance
+    trader.quantity_precision = {}
+    trader.price_precision = {}
+    trader.tick_size = {}
+    trader.min_notional = {}
+    trader._symbol_generation = 0
+    trader._index_exchange_info(EXCHANGE_INFO)
+    trader.active_trades = {}
+    trader._trades_lock = threading.Lock()
+    trader._order_bucket = TokenBucket(rate=1000, burst=1000)
+    trader._market_pool = ThreadPoolExecutor(max_workers=2)
+    trader._api_error = None
+    yield trader
+    trader._market_pool.shutdown(wait=True)
@@ -0,0 +1,111 @@
+"""Pure money-path helpers in bot.py: lot/tick precision, TP/SL snapping, LLM JSON extraction"""
+import json
+
+import pytest
+
+from bot import (
+    compute_tp_sl,
+    extract_json_object,
+    precision_from_step,
+    read_streamed_json_object,
+    round_to_tick,
+)
+
+
+@pytest.mark.parametrize("step, expected", [
+    ("10", 0),
+    ("1", 0),
+    ("1.0", 0),
+    ("0.5", 1),
+    ("0.025", 3),
+    ("0.0010", 3),
+    ("0.00000100", 6),
+    (0.001, 3),
+    ("0", 0),
+])
+def test_precision_from_step(step, expected):
+    assert precision_from_step(step) == expected
+
+
+def test_round_to_tick_nearest():
+    assert round_to_tick(101.26, 0.1) == pytest.approx(101.3)
+    assert round_to_tick(101.24, 0.1) == pytest.approx(101.2)
+    assert round_to_tick(0.123456, 0.0001) == pytest.approx(0.1235)
+
+
+def test_tp_sl_long_snaps_outward():
+    take_profit, stop_loss = compute_tp_sl(100.0, 1.0, 0.0123, 0.0077, 0.1)
+    assert take_profit == pytest.approx(101.3)  # 101.23 rounds up
+    assert stop_loss == pytest.approx(99.2)     # 99.23 rounds down
+    assert stop_loss < 100.0 < take_profit
+
+
+def test_tp_sl_short_snaps_outward():
+    take_profit, stop_loss = compute_tp_sl(100.0, -1.0, 0.0123, 0.0077, 0.1)
+    assert take_profit == pytest.approx(98.7)   # 98.77 rounds down
+    assert stop_loss == pytest.approx(100.8)    # 100.77 rounds up
+    assert take_profit < 100.0 < stop_loss
+
+
+def test_tp_sl_on_grid_values_stay_put():
+    # 100 * 1.01 is 101.00000000000001 in floats - must not be pushed a whole tick out
+    take_profit, stop_loss = compute_tp_sl(100.0, 1.0, 0.01, 0.01, 0.01)
+    assert take_profit == pytest.approx(101.0)
+    assert stop_loss == pytest.approx(99.0)
+
+
+def test_tp_sl_without_tick_is_unrounded():
+    take_profit, stop_loss = compute_tp_sl(100.0, 1.0, 0.0123, 0.0077, 0.0)
+    assert take_profit == pytest.approx(101.23)
+    assert stop_loss == pytest.approx(99.23)
+
+
+def test_extract_json_object_ignores_surrounding_prose():
+    content = 'Sure! {"pair": "ETHUSDT", "meta": {"a": {"b": 1}}} hope this helps {junk}'
+    assert extract_json_object(content) == {"pair": "ETHUSDT", "meta": {"a": {"b": 1}}}
+
+
+def test_extract_json_object_skips_non_json_braces():
+    content = 'Use {placeholders} like this: {"action": "SKIP", "reason": "range {tight}"}'
+    assert extract_json_object(content) == {"action": "SKIP", "reason": "range {tight}"}
+
+
+def test_extract_json_object_none_without_object():
+    assert extract_json_object("no json here") is None
+    assert extract_json_object('{"unterminated": ') is None
+
+
+class _StreamedReply:
+    """requests.Response stand-in: an SSE chat completion split into fixed-size content chunks"""
+
+    def __init__(self, content, chunk_size):
+        self.chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        self.lines_read = 0
+
+    def iter_lines(self):
+        for chunk in self.chunks:
+            self.lines_read += 1
+            yield b"data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}).encode()
+            yield b""
+        yield b"data: [DONE]"
+
+
+REPLY = {"decisions": [{"pair": "ETHUSDT", "action": "TRADE", "reason": "break of {range} \"top\"",
+                        "levels": {"tp": {"price": 1}}}]}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_read_streamed_json_object_across_chunk_boundaries(chunk_size):
+    response = _StreamedReply("Here you go: " + json.dumps(REPLY), chunk_size)
+    assert read_streamed_json_object(response) == REPLY
+
+
+def test_read_streamed_json_object_stops_at_closing_brace():
+    content = json.dumps(REPLY) + " " + "trailing explanation " * 50
+    response = _StreamedReply(content, 8)
+    assert read_streamed_json_object(response) == REPLY
+    assert response.lines_read < len(response.chunks)  # didn't wait for the prose
+
+
+def test_read_streamed_json_object_none_without_object():
+    assert read_streamed_json_object(_StreamedReply("nothing to parse", 4)) is None
@@ -0,0 +1,53 @@
+"""TP/SL placement: one batchOrders call, per-leg fallback only where the batch endpoint refuses"""
+import pytest
+
+from conftest import api_error
+
+SL = {"symbol": "ETHUSDT", "side": "SELL", "type": "STOP_MARKET", "quantity": "0.05",
+      "stopPrice": "3482.50", "newClientOrderId": "sn-SL-ETHUSDT-1"}
+TP = {"symbol": "ETHUSDT", "side": "SELL", "type": "TAKE_PROFIT_MARKET", "quantity": "0.05",
+      "stopPrice": "3528.00", "newClientOrderId": "sn-TP-ETHUSDT-1"}
+
+
+def test_batch_places_both_legs_in_one_call(trader, binance):
+    binance.responses["futures_place_batch_order"] = [{"orderId": 1}, {"orderId": 2}]
+    assert trader.place_protective_orders([SL, TP]) == [{"orderId": 1}, {"orderId": 2}]
+    assert binance.called("futures_place_batch_order") == [{"batchOrders": [SL, TP]}]
+    assert binance.called("futures_create_order") == []
+
+
+def test_batch_refused_falls_back_to_single_orders(trader, binance):
+    binance.responses["futures_place_batch_order"] = api_error(400, -1116, "Invalid orderType.")
+    binance.responses["futures_create_order"] = lambda **params: {"orderId": params["newClientOrderId"]}
+    results = trader.place_protective_orders([SL, TP])
+    assert [r["orderId"] for r in results] == ["sn-SL-ETHUSDT-1", "sn-TP-ETHUSDT-1"]
+
+
+@pytest.mark.parametrize("status_code, code", [(503, -1001), (429, -1003), (400, -1021), (400, -2010)])
+def test_other_batch_errors_are_raised_not_resent(trader, binance, status_code, code):
+    # After a 5xx the batch may be live - resending the same client ids would only get duplicates
+    binance.responses["futures_place_batch_order"] = api_error(status_code, code)
+    with pytest.raises(Exception) as raised:
+        trader.place_protective_orders([SL, TP])
+    assert raised.value.code == code
+    assert binance.called("futures_create_order") == []
+
+
+def test_only_refused_legs_are_resent(trader, binance):
+    binance.responses["futures_place_batch_order"] = [{"code": -1116, "msg": "Invalid orderType."}, {"orderId": 2}]
+    binance.responses["futures_create_order"] = {"orderId": 3}
+    assert trader.place_protective_orders([SL, TP]) == [{"orderId": 3}, {"orderId": 2}]
+    assert binance.called("futures_create_order") == [SL]
+
+
+def test_duplicate_client_id_counts_as_placed(trader, binance):
+    duplicate = {"code": -4116, "msg": "ClientOrderId is duplicated."}
+    binance.responses["futures_place_batch_order"] = [duplicate, {"orderId": 2}]
+    trader.place_protective_orders([SL, TP])
+    assert binance.called("futures_create_order") == []
+
+
+def test_rejected_leg_raises(trader, binance):
+    binance.responses["futures_place_batch_order"] = [{"orderId": 1}, {"code": -2022, "msg": "ReduceOnly rejected."}]
+    with pytest.raises(RuntimeError, match="-2022"):
+        trader.place_protective_orders([SL, TP])
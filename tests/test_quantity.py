@@ -0,0 +1,37 @@
+"""Order sizing: lot-step flooring and the exchange minimums"""
+import pytest
+
+
+@pytest.mark.parametrize("pair, price, expected", [
+    ("ETHUSDT", 3001.0, 0.066),   # 0.06664 - nearest step would be 0.067 = $201 > $200
+    ("XRPUSDT", 0.61, 81.9),      # 81.967 floors, not 82.0
+    ("XRPUSDT", 0.5, 100.0),      # 50 / 0.5 / 0.1 is 999.999... in floats - still 1000 steps
+    ("AVAXUSDT", 30.0, 1),        # 1.67 whole coins -> 1, not 2 ($60 > $50)
+])
+def test_get_quantity_floors_to_the_lot_step(trader, pair, price, expected):
+    quantity = trader.get_quantity(pair, price)
+    assert quantity == pytest.approx(expected)
+    assert quantity * price <= trader.get_dynamic_trade_size(pair, price)
+
+
+def test_get_quantity_whole_coin_pairs_are_int(trader):
+    assert isinstance(trader.get_quantity("AVAXUSDT", 30.0), int)
+
+
+@pytest.mark.parametrize("pair, price, min_notional, expected", [
+    ("AVAXUSDT", 3.7, 20, 6),       # 5 coins = $18.5 would get -4164 - round up to 6
+    ("XRPUSDT", 0.6, 20, 33.4),     # 33.3 = $19.98 - one more step
+    ("XRPUSDT", 0.5, 20, 40.0),     # exactly on the step grid - no extra step
+])
+def test_minimum_order_quantity_meets_min_notional(trader, pair, price, min_notional, expected):
+    trader.min_notional[pair] = min_notional
+    precision, as_int, step = trader._qty_round[pair]
+    quantity = trader._get_minimum_order_quantity(pair, price, precision, as_int, step)
+    assert quantity == pytest.approx(expected)
+    assert quantity * price >= min_notional
+
+
+def test_minimum_order_larger_than_trade_size_is_skipped(trader):
+    # $40 minimum at $30 a coin needs 2 coins = $60, past the $50 trade size
+    trader.min_notional["AVAXUSDT"] = 40
+    assert trader.get_quantity("AVAXUSDT", 30.0) is None
@@ -0,0 +1,86 @@
+"""Trade completion: user-data stream events and the REST position sweep"""
+import time
+
+import pytest
+
+from bot import ActiveTrade
+from conftest import api_error
+
+SL_ID = "sn-SL-ETHUSDT-1"
+TP_ID = "sn-TP-ETHUSDT-1"
+
+
+def open_trade(trader, pair="ETHUSDT", direction="LONG"):
+    trader.active_trades[pair] = ActiveTrade(
+        pair=pair, direction=direction, entry_price=3500.0, quantity=0.05, stop_loss=3482.5,
+        take_profit=3528.0, entry_time=time.time(), confidence=80, exit_order_ids=(SL_ID, TP_ID),
+    )
+
+
+def cancelled_ids(trader, binance):
+    trader._market_pool.shutdown(wait=True)  # leftover-leg cancels run on the pool
+    return [params["origClientOrderId"] for params in binance.called("futures_cancel_order")]
+
+
+def account_update(*positions):
+    return {"e": "ACCOUNT_UPDATE", "a": {"P": [{"s": s, "pa": pa, "ps": ps} for s, pa, ps in positions]}}
+
+
+@pytest.mark.parametrize("direction, position, completed", [
+    ("LONG", ("ETHUSDT", "0", "BOTH"), True),        # one-way mode, flat
+    ("LONG", ("ETHUSDT", "0.05", "BOTH"), False),    # one-way mode, still long
+    ("LONG", ("ETHUSDT", "-0.05", "BOTH"), True),    # one-way mode, flipped short
+    ("LONG", ("ETHUSDT", "0", "LONG"), True),        # hedge mode, our side flat
+    ("LONG", ("ETHUSDT", "0", "SHORT"), False),      # hedge mode, the other side flat
+    ("SHORT", ("ETHUSDT", "0", "LONG"), False),
+    ("LONG", ("SOLUSDT", "0", "BOTH"), False),       # another symbol
+])
+def test_account_update_completes_only_our_flat_side(trader, binance, direction, position, completed):
+    open_trade(trader, direction=direction)
+    trader._handle_user_event(account_update(position))
+    assert ("ETHUSDT" not in trader.active_trades) == completed
+    assert cancelled_ids(trader, binance) == ([SL_ID, TP_ID] if completed else [])
+
+
+def test_leg_fill_cancels_only_the_other_leg(trader, binance):
+    open_trade(trader)
+    trader._handle_user_event({"e": "ORDER_TRADE_UPDATE", "o": {"s": "ETHUSDT", "X": "FILLED", "R": True, "c": TP_ID}})
+    assert "ETHUSDT" not in trader.active_trades
+    assert cancelled_ids(trader, binance) == [SL_ID]
+
+
+def test_manual_reduce_only_fill_keeps_the_trade(trader, binance):
+    open_trade(trader)
+    trader._handle_user_event({"e": "ORDER_TRADE_UPDATE", "o": {"s": "ETHUSDT", "X": "FILLED", "R": True, "c": "web_1"}})
+    assert "ETHUSDT" in trader.active_trades
+    assert cancelled_ids(trader, binance) == []
+
+
+def position(symbol, amount, side="BOTH"):
+    return {"symbol": symbol, "positionAmt": amount, "positionSide": side}
+
+
+@pytest.mark.parametrize("direction, positions, completed", [
+    ("LONG", [position("ETHUSDT", "0.050")], False),
+    ("LONG", [position("ETHUSDT", "0.000")], True),                 # zero row is flat, not open
+    ("SHORT", [position("ETHUSDT", "-0.050")], False),
+    ("LONG", [position("ETHUSDT", "-0.050")], True),                # one-way mode, flipped short
+    ("LONG", [position("ETHUSDT", "0.050", "LONG"), position("ETHUSDT", "0.000", "SHORT")], False),
+    ("SHORT", [position("ETHUSDT", "0.050", "LONG"), position("ETHUSDT", "0.000", "SHORT")], True),
+    ("LONG", [position("SOLUSDT", "1.0")], True),                   # only another symbol open
+    ("LONG", [], True),
+])
+def test_position_sweep_completes_trades_without_a_position(trader, binance, direction, positions, completed):
+    open_trade(trader, direction=direction)
+    binance.responses["futures_position_information"] = positions
+    trader.check_scalping_trades()
+    assert ("ETHUSDT" not in trader.active_trades) == completed
+    assert cancelled_ids(trader, binance) == ([SL_ID, TP_ID] if completed else [])
+
+
+def test_position_sweep_error_keeps_trades(trader, binance):
+    open_trade(trader)
+    binance.responses["futures_position_information"] = api_error(503, -1001)
+    trader.check_scalping_trades()
+    assert "ETHUSDT" in trader.active_trades
+    assert trader._api_error is not None  # transient - the main loop backs off